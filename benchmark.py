@@ -0,0 +1,195 @@
+"""
+Deterministic end-to-end latency benchmark.
+
+Live sessions vary too much (OpenAI, DuckDuckGo, Wikipedia) to catch
+regressions, so the benchmark replays recorded cassettes instead: every
+external call is served offline and the measured time is only the agent's
+own overhead (graph steps, tool CPU, file I/O).
+
+Usage:
+    python benchmark.py --record            # live run, one cassette per TEST_EXAMPLES.md query
+    python benchmark.py --update-baseline   # replay and store the timings as the baseline
+    python benchmark.py                     # replay and fail on regressions vs. the baseline
+    python benchmark.py --profile           # also write CPU/memory profiles per cassette
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+from main import run_session
+import cassette
+import profiling
+
+CASSETTE_DIR = os.path.join("benchmarks", "cassettes")
+BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+PROFILE_DIR = os.path.join("benchmarks", "profiles")
+
+
+def load_queries(path: str = "TEST_EXAMPLES.md") -> list:
+    """All queries from the **Query:** code blocks of TEST_EXAMPLES.md"""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    # The trailing template section is not a test
+    content = content.split("## Template for Adding New Tests")[0]
+    return [q.strip() for q in re.findall(r"\*\*Query:\*\*\s*```\s*\n(.*?)\n```", content, re.DOTALL)]
+
+
+def cassette_name(index: int, query: str) -> str:
+    words = re.findall(r"[a-z0-9]+", query.lower())[:4]
+    return f"{index:02d}_{'_'.join(words) or 'query'}.json"
+
+
+def quiet_session(query: str, output_root: str, **kwargs):
+    """Run a session with its console output suppressed"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return run_session(query, output_root=output_root, **kwargs)
+
+
+def record(queries: list) -> None:
+    os.makedirs(CASSETTE_DIR, exist_ok=True)
+    for i, query in enumerate(queries, 1):
+        print(f"📼 [{i}/{len(queries)}] Recording: {query[:60]}")
+        output_root = tempfile.mkdtemp(prefix="bench_record_")
+        try:
+            folder = quiet_session(query, output_root, record=True)
+            if folder is None:
+                print("   ❌ Session failed, no cassette written")
+                continue
+            target = os.path.join(CASSETTE_DIR, cassette_name(i, query))
+            shutil.copy(os.path.join(folder, cassette.CASSETTE_FILE), target)
+            print(f"   ✅ {target}")
+        finally:
+            shutil.rmtree(output_root, ignore_errors=True)
+
+
+def replay(repeat: int) -> dict:
+    """Best-of-`repeat` replay time per cassette (None if the replay failed)"""
+    timings = {}
+    for name in sorted(os.listdir(CASSETTE_DIR)):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(CASSETTE_DIR, name)
+        query = cassette.load_query(path)
+
+        best = None
+        for _ in range(repeat):
+            # Fresh output root per run so session state never carries over
+            output_root = tempfile.mkdtemp(prefix="bench_replay_")
+            try:
+                start = time.perf_counter()
+                folder = quiet_session(query, output_root, replay=path)
+                elapsed = time.perf_counter() - start
+            finally:
+                shutil.rmtree(output_root, ignore_errors=True)
+            if folder is None:
+                best = None
+                break
+            best = elapsed if best is None else min(best, elapsed)
+
+        timings[name] = best
+        status = f"{best:.3f}s" if best is not None else "❌ replay failed"
+        print(f"  • {name}: {status}")
+    return timings
+
+
+def profile() -> None:
+    """One extra profiled replay per cassette, kept apart from the timed runs"""
+    for name in sorted(os.listdir(CASSETTE_DIR)):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(CASSETTE_DIR, name)
+        target = os.path.join(PROFILE_DIR, name[:-len(".json")])
+        output_root = tempfile.mkdtemp(prefix="bench_profile_")
+        try:
+            folder = quiet_session(cassette.load_query(path), output_root, replay=path, profile=True)
+            if folder is None:
+                print(f"  • {name}: ❌ replay failed")
+                continue
+            os.makedirs(target, exist_ok=True)
+            for report in (profiling.HOTSPOTS_FILE, profiling.STACKS_FILE, profiling.MEMORY_FILE):
+                shutil.copy(os.path.join(folder, report), target)
+            print(f"  • {name}: {target}")
+        finally:
+            shutil.rmtree(output_root, ignore_errors=True)
+
+
+def compare(timings: dict, baseline: dict, threshold: float) -> bool:
+    """Print the comparison table; True when nothing regressed or failed"""
+    ok = True
+    print("\n" + "=" * 70)
+    print(f"{'Cassette':<45} {'Baseline':>9} {'Now':>9} {'Change':>7}")
+    print("=" * 70)
+    for name, now in timings.items():
+        before = baseline.get(name)
+        if now is None:
+            ok = False
+            print(f"{name:<45} {'':>9} {'FAILED':>9}")
+            continue
+        if before is None:
+            print(f"{name:<45} {'-':>9} {now:>8.3f}s {'new':>7}")
+            continue
+        change = (now - before) / before if before else 0.0
+        flag = " ❌" if change > threshold else ""
+        ok = ok and change <= threshold
+        print(f"{name:<45} {before:>8.3f}s {now:>8.3f}s {change:>+6.0%}{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay benchmark for the research agent")
+    parser.add_argument("--record", action="store_true",
+                        help="Record cassettes with live API calls")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Store replay timings as the new baseline")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Replays per cassette, the best time is kept (default: 3)")
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="Allowed slowdown vs. baseline before failing (default: 0.20)")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"After timing, replay each cassette once more under the profiler "
+                             f"and keep the reports in {PROFILE_DIR}")
+    args = parser.parse_args()
+
+    if args.record:
+        record(load_queries())
+        return
+
+    if not os.path.isdir(CASSETTE_DIR):
+        print(f"❌ No cassettes in {CASSETTE_DIR}. Record them first: python benchmark.py --record")
+        sys.exit(1)
+
+    print(f"⏱️  Replaying cassettes from {CASSETTE_DIR} (best of {args.repeat})")
+    timings = replay(args.repeat)
+
+    if args.profile:
+        print("\n🔬 Profiling one more replay per cassette")
+        profile()
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump({k: v for k, v in timings.items() if v is not None}, f, indent=2)
+        print(f"\n✅ Baseline written to {BASELINE_PATH}")
+        return
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if compare(timings, baseline, args.threshold):
+        print("\n✅ No regressions")
+    else:
+        print(f"\n❌ Regression above {args.threshold:.0%} or failed replay")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Record/replay cassettes for agent sessions.
+
+Every external call goes through resilience.Backend.call, so that is where
+interactions are captured. In record mode each LLM response, search /
+Wikipedia result and HTTP response is appended to a cassette (one JSON file
+per session). In replay mode the same calls are served from the cassette
+without touching the network, so a session can be re-run offline and its
+timing reflects only the agent's own overhead (graph steps, tool CPU, file
+I/O).
+
+Interactions are matched per backend, in order, by key. For tools the key
+is the call's string arguments (the query or URL). For LLM calls it is the
+model name, its bound tools and a digest of the conversation. Tool results
+are left out of the digest because they hold timings and session paths.
+If a change alters routing, the prompt or the tool set, replay raises
+CassetteMissError instead of serving responses recorded for other prompts.
+Concurrent calls on a backend (web_fetch_tool) take the first unused
+interaction with their key.
+"""
+
+import base64
+import hashlib
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+CASSETTE_FILE = "cassette.json"
+
+
+class CassetteMissError(Exception):
+    """Replay reached a call that is not in the cassette"""
+
+
+class ReplayedError(Exception):
+    """Error recorded during the original session, raised again on replay"""
+
+
+def _describe_model(model: Any) -> str:
+    bound = getattr(model, "bound", model)
+    name = (getattr(bound, "model_name", None) or getattr(bound, "model", None)
+            or type(bound).__name__)
+    tools = getattr(model, "kwargs", {}).get("tools") or []
+    names = sorted(t.get("function", t).get("name", "?") if isinstance(t, dict)
+                   else getattr(t, "name", "?") for t in tools)
+    return f"{name}[{','.join(names)}]"
+
+
+def _describe_messages(messages: List) -> str:
+    shape = []
+    for m in messages:
+        shape.append({
+            "type": m.type,
+            "content": "" if m.type == "tool" else m.content,
+            "tool_calls": [[tc["name"], tc["args"]] for tc in getattr(m, "tool_calls", None) or []],
+        })
+    digest = hashlib.sha1(json.dumps(shape, sort_keys=True, default=str).encode()).hexdigest()
+    return f"{len(messages)} messages sha1:{digest[:12]}"
+
+
+def _call_key(args) -> str:
+    from langchain_core.messages import BaseMessage
+    from langchain_core.runnables import Runnable
+
+    parts = []
+    for arg in args:
+        if isinstance(arg, str):
+            parts.append(arg)
+        elif isinstance(arg, list) and arg and all(isinstance(m, BaseMessage) for m in arg):
+            parts.append(_describe_messages(arg))
+        elif isinstance(arg, Runnable):
+            parts.append(_describe_model(arg))
+    return " ".join(parts)
+
+
+def _serialize(result: Any) -> Dict:
+    if isinstance(result, str):
+        return {"type": "str", "value": result}
+
+    # requests.Response (PDF downloads, web pages)
+    if hasattr(result, "status_code") and hasattr(result, "content"):
+        return {
+            "type": "http",
+            "url": result.url,
+            "status": result.status_code,
+            "headers": dict(result.headers),
+            "encoding": result.encoding,
+            "content": base64.b64encode(result.content).decode("ascii"),
+        }
+
+    # LangChain message (LLM responses)
+    from langchain_core.messages import BaseMessage, message_to_dict
+    if isinstance(result, BaseMessage):
+        return {"type": "message", "value": message_to_dict(result)}
+
+    raise TypeError(f"Cannot record result of type {type(result).__name__}")
+
+
+def _deserialize(entry: Dict) -> Any:
+    kind = entry["type"]
+    if kind == "str":
+        return entry["value"]
+
+    if kind == "http":
+        import requests
+        from requests.structures import CaseInsensitiveDict
+
+        response = requests.Response()
+        response.url = entry["url"]
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = entry["encoding"]
+        response._content = base64.b64decode(entry["content"])
+        return response
+
+    if kind == "message":
+        from langchain_core.messages import messages_from_dict
+        return messages_from_dict([entry["value"]])[0]
+
+    raise ValueError(f"Unknown cassette entry type: {kind}")
+
+
+class Cassette:
+    """Ordered interactions of one session, grouped by backend"""
+
+    def __init__(self, mode: str, path: str, query: Optional[str] = None):
+        self.mode = mode
+        self.path = path
+        self.query = query
+        self.interactions: List[Dict] = []
+        self.used = set()
+        self.lock = threading.Lock()
+
+        if mode == "replay":
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.query = data.get("query")
+            self.interactions = data["interactions"]
+
+    def record(self, backend: str, args, result: Any = None, error: Exception = None):
+        entry = {"backend": backend, "key": _call_key(args)}
+        if error is not None:
+            entry["error"] = {"type": type(error).__name__, "message": str(error)}
+        else:
+            entry["response"] = _serialize(result)
+        with self.lock:
+            self.interactions.append(entry)
+
+    def replay(self, backend: str, args) -> Any:
+        key = _call_key(args)
+        with self.lock:
+            match = None
+            for idx, entry in enumerate(self.interactions):
+                if idx in self.used or entry["backend"] != backend:
+                    continue
+                if entry["key"] == key:
+                    match = idx
+                    break
+            if match is None:
+                raise CassetteMissError(f"No recorded {backend} call for: {key[:80]}")
+            self.used.add(match)
+            entry = self.interactions[match]
+
+        if "error" in entry:
+            raise ReplayedError(f"{entry['error']['type']}: {entry['error']['message']}")
+        return _deserialize(entry["response"])
+
+    def save(self):
+        with self.lock:
+            data = {"query": self.query, "interactions": self.interactions}
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, ensure_ascii=False)
+
+
+_active: Optional[Cassette] = None
+
+
+def get_active() -> Optional[Cassette]:
+    return _active
+
+
+def start(mode: str, path: str, query: Optional[str] = None) -> Cassette:
+    """Start recording to (mode="record") or replaying from (mode="replay") a cassette"""
+    global _active
+    _active = Cassette(mode, path, query)
+    return _active
+
+
+def stop() -> None:
+    """Stop the active cassette, writing it to disk when recording"""
+    global _active
+    if _active is not None and _active.mode == "record":
+        _active.save()
+    _active = None
+
+
+def load_query(path: str) -> str:
+    """Query of the session a cassette was recorded from"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["query"]
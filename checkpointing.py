@@ -0,0 +1,65 @@
+"""
+Durable checkpointing for agent sessions.
+
+Every session folder gets a local SQLite checkpoint database, keyed by the
+session folder name. LangGraph writes a checkpoint after every completed
+step (and records finished tool calls as pending writes), so an interrupted
+run can be resumed with `python main.py --resume <session>` without
+repeating the LLM and tool calls that already completed.
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Sequence
+
+CHECKPOINT_DB = "checkpoints.sqlite"
+SESSION_META = "session.json"
+
+
+def resolve_session_folder(session: str) -> str:
+    """Accept either a session folder path or a folder name under outputs/"""
+    if os.path.isdir(session):
+        return os.path.normpath(session)
+
+    folder = os.path.join("outputs", session)
+    if os.path.isdir(folder):
+        return folder
+
+    raise FileNotFoundError(f"Session folder not found: {session}")
+
+
+def session_thread_id(output_folder: str) -> str:
+    """Checkpoint thread id for a session (its folder name)"""
+    return os.path.basename(os.path.normpath(output_folder))
+
+
+def save_session_meta(output_folder: str, query: str, tools: Sequence) -> None:
+    """Store what is needed to rebuild the agent when resuming"""
+    meta = {
+        "query": query,
+        "tools": [t.name for t in tools],
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    with open(os.path.join(output_folder, SESSION_META), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+
+
+def load_session_meta(output_folder: str) -> Dict:
+    path = os.path.join(output_folder, SESSION_META)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No {SESSION_META} in {output_folder}, cannot resume")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def open_checkpointer(output_folder: str):
+    """SQLite checkpointer stored inside the session folder"""
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    conn = sqlite3.connect(
+        os.path.join(output_folder, CHECKPOINT_DB),
+        check_same_thread=False,  # tool calls run in worker threads
+    )
+    return SqliteSaver(conn)
@@ -0,0 +1,218 @@
+"""
+Near-duplicate suppression for research content.
+
+Search results, Wikipedia intros and fetched pages often repeat text the
+model has already seen in the session. Every copy costs prompt tokens on
+every later step. This module keeps a MinHash signature of each passage
+shown in a session and replaces near-duplicates with a short
+back-reference to the earlier result. References must name something the
+model can see: results are tagged with their label (e.g. "[wiki_tool
+result #1]"), or labelled with something already shown, like a page URL.
+
+Similarity is the Jaccard index of the passages' word bigrams, estimated
+from 96 MinHash values. Mirrored and lightly edited passages (a few words
+substituted or dropped, a reworded clause, a truncated snippet) score 0.6
+and above, while different passages on the same topic stay below 0.1, so
+passages scoring at least 0.4 are collapsed. Lookups use LSH: 32 bands of 3
+values, so a passage is only compared against candidates sharing a band.
+
+Only text that was actually returned to the model counts as seen: when a
+result is cut to a preview (see tools.spill_large_result), the passages
+that stayed in the artifact are not remembered.
+"""
+
+import os
+import re
+import threading
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+SHINGLE = 2              # words per shingle
+NUM_PERM = 96
+BANDS = 32               # LSH bands of NUM_PERM // BANDS rows each
+THRESHOLD = 0.4          # estimated Jaccard similarity to count as a repeat
+MIN_WORDS = 8            # shorter passages are cheap, never collapsed
+MAX_SEGMENT_CHARS = 400  # longer lines are split into sentence groups
+_ROWS = NUM_PERM // BANDS
+_WORD_RE = re.compile(r"\w+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+_MIX = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xC2B2AE3D27D4EB4F))
+_SEEDS = np.random.default_rng(0x5EED).integers(1, 2 ** 63, size=NUM_PERM, dtype=np.uint64)
+
+
+def _shingle_hashes(words: List[str]) -> np.ndarray:
+    """64-bit hashes of the word bigrams of a passage"""
+    # Hash each word once (deterministic across runs, unlike hash()), then
+    # combine neighbouring words with vectorized multiply-xor mixing
+    encoded = [w.encode() for w in words]
+    h = np.array([zlib.crc32(b) | (zlib.crc32(b, 0x5BD1E995) << 32) for b in encoded],
+                 dtype=np.uint64)
+    if len(h) >= SHINGLE:
+        h = (h[:-1] * _MIX[0]) ^ h[1:]
+    return h
+
+
+def minhash(words: List[str]) -> np.ndarray:
+    """NUM_PERM MinHash values over the word bigrams of a passage"""
+    # One seeded mixing function per permutation, applied to all shingles at once
+    x = _shingle_hashes(words)[None, :] ^ _SEEDS[:, None]
+    x *= _MIX[0]
+    x ^= x >> np.uint64(29)
+    x *= _MIX[1]
+    x ^= x >> np.uint64(32)
+    return x.min(axis=1)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures"""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def _bands(signature: np.ndarray) -> List[Tuple[int, bytes]]:
+    return list(enumerate(row.tobytes() for row in signature.reshape(BANDS, _ROWS)))
+
+
+def _segments(line: str) -> List[str]:
+    return _SENTENCE_RE.split(line) if len(line) > MAX_SEGMENT_CHARS else [line]
+
+
+class DedupStore:
+    """Signatures of passages already shown to the model in one session"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.signatures: List[Tuple[np.ndarray, str]] = []   # (signature, label)
+        self.index: Dict[Tuple[int, bytes], List[int]] = {}
+        self.calls: Dict[str, int] = {}
+        self.passages = 0
+        self.duplicates = 0
+        self.chars_saved = 0
+
+    def _find(self, signature: np.ndarray) -> Optional[str]:
+        checked = set()
+        for key in _bands(signature):
+            for idx in self.index.get(key, ()):
+                if idx in checked:
+                    continue
+                checked.add(idx)
+                other, label = self.signatures[idx]
+                if similarity(signature, other) >= THRESHOLD:
+                    return label
+        return None
+
+    def _add(self, signature: np.ndarray, label: str):
+        idx = len(self.signatures)
+        self.signatures.append((signature, label))
+        for key in _bands(signature):
+            self.index.setdefault(key, []).append(idx)
+
+    def collapse(self, text: str, source: str, label: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Return `text` with passages already seen in this session (or earlier
+        in the same text) collapsed into back-references, and the label of
+        this result (default "<source> result #<n>"). Nothing is remembered
+        yet, see remember().
+        """
+        with self.lock:
+            if label is None:
+                self.calls[source] = self.calls.get(source, 0) + 1
+                label = f"{source} result #{self.calls[source]}"
+
+            local = DedupStore()
+            out_lines = []
+            for line in text.split("\n"):
+                kept = []
+                for segment in _segments(line):
+                    words = _WORD_RE.findall(segment.lower())
+                    if len(words) < MIN_WORDS:
+                        kept.append(segment)
+                        continue
+
+                    self.passages += 1
+                    signature = minhash(words)
+                    seen_in = self._find(signature) or local._find(signature)
+                    if seen_in is None:
+                        local._add(signature, label)
+                        kept.append(segment)
+                        continue
+
+                    self.duplicates += 1
+                    marker = f"[≈ repeats {seen_in}]"
+                    if kept and kept[-1] == marker:
+                        # Consecutive duplicates of the same result share one marker
+                        self.chars_saved += len(segment) + 1
+                        continue
+                    self.chars_saved += max(0, len(segment) - len(marker))
+                    kept.append(marker)
+
+                out_lines.append(" ".join(kept))
+            return "\n".join(out_lines), label
+
+    def remember(self, text: str, label: str):
+        """Mark the passages of `text`, as shown to the model, as seen"""
+        with self.lock:
+            for line in text.split("\n"):
+                for segment in _segments(line):
+                    words = _WORD_RE.findall(segment.lower())
+                    if len(words) < MIN_WORDS:
+                        continue
+                    signature = minhash(words)
+                    if self._find(signature) is None:
+                        self._add(signature, label)
+
+    def dedup(self, text: str, source: str) -> str:
+        """Collapse repeats in `text` and remember all of it as shown"""
+        collapsed, label = self.collapse(text, source)
+        self.remember(collapsed, label)
+        return collapsed
+
+    def summary(self) -> str:
+        return (f"{self.duplicates}/{self.passages} passages collapsed, "
+                f"~{self.chars_saved // 4} tokens saved")
+
+
+_stores: Dict[str, DedupStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(session: str) -> DedupStore:
+    with _stores_lock:
+        if session not in _stores:
+            _stores[session] = DedupStore()
+        return _stores[session]
+
+
+def dedup_text(text: str, source: str, session: str,
+               bound: Optional[Callable[[str], str]] = None,
+               label: Optional[str] = None) -> str:
+    """
+    Collapse near-duplicate passages of `text` (AGENT_DEDUP=off disables).
+
+    Later repeats refer back to this result by `label`, which must be visible
+    to the model already (e.g. the URL in a page heading). Without one, the
+    result is labelled "<source> result #<n>" and starts with that tag.
+
+    `bound` (e.g. spill_large_result) is applied to the collapsed text before
+    it is remembered, so only what the model is actually shown counts as seen.
+    """
+    bound = bound or (lambda t: t)
+    if os.environ.get("AGENT_DEDUP", "on").lower() in ("off", "0", "false"):
+        return bound(text)
+    if not isinstance(text, str) or not text:
+        return bound(text)
+    store = get_store(session)
+    tagged = label is None
+    collapsed, label = store.collapse(text, source, label)
+    shown = bound(f"[{label}]\n{collapsed}" if tagged else collapsed)
+    store.remember(shown, label)
+    return shown
+
+
+def dedup_summary(session: str) -> str:
+    with _stores_lock:
+        store = _stores.get(session)
+    return store.summary() if store else "No content deduplicated"
@@ -1,34 +1,53 @@
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+from langchain_core.messages import HumanMessage, SystemMessage
 from langgraph.prebuilt import create_react_agent
+from routing import build_router_from_env
+from tool_selection import select_tools, estimate_tool_tokens
+from resilience import metrics_summary, reset_backends
+from dedup import dedup_summary
+from plotting import warm_pool
+import cassette
+from checkpointing import (
+    resolve_session_folder,
+    session_thread_id,
+    save_session_meta,
+    load_session_meta,
+    open_checkpointer
+)
 from tools import (
     save_tool, 
     search_tool, 
     wiki_tool,
     calculator_tool,
     plot_tool,
+    plot_batch_tool,
     data_analysis_tool,
     file_reader_tool,
     code_executor_tool,
     weather_tool,
     summarize_tool,
     pdf_reader_tool,
-    url_pdf_reader_tool
+    url_pdf_reader_tool,
+    web_fetch_tool,
+    artifact_reader_tool
 )
 import os
+import argparse
+import logging
 from datetime import datetime
 import re
 
 load_dotenv()
+logging.basicConfig(level=os.environ.get("AGENT_LOG_LEVEL", "WARNING").upper())
 
-def create_output_folder(query: str) -> str:
+def create_output_folder(query: str, root: str = "outputs") -> str:
     """
     Create a unique output folder for this session.
     Format: outputs/{DATE}_{TOPIC_IN_TWO_WORDS}
     """
     # Create outputs directory if it doesn't exist
-    if not os.path.exists("outputs"):
-        os.makedirs("outputs")
+    if not os.path.exists(root):
+        os.makedirs(root)
     
     # Get current date
     date_str = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -46,80 +65,75 @@ def create_output_folder(query: str) -> str:
     
     # Create folder name
     folder_name = f"{date_str}_{topic}"
-    folder_path = os.path.join("outputs", folder_name)
+    folder_path = os.path.join(root, folder_name)
     
     # Create the folder
     os.makedirs(folder_path, exist_ok=True)
     
     return folder_path
 
-def main():
-    # Initialize LLM with better configuration
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0.7,
-        max_tokens=2000
-    )
-    
-    # Comprehensive tool list
-    tools = [
-        save_tool,
-        search_tool,
-        wiki_tool,
-        calculator_tool,
-        plot_tool,
-        data_analysis_tool,
-        file_reader_tool,
-        code_executor_tool,
-        weather_tool,
-        summarize_tool,
-        pdf_reader_tool,
-        url_pdf_reader_tool
-    ]
-    
-    # Create agent with tools
-    agent = create_react_agent(llm, tools)
-    
-    system_prompt = """
-You are an advanced research and analysis assistant with multiple capabilities.
+# Comprehensive tool list
+TOOLS = [
+    save_tool,
+    search_tool,
+    wiki_tool,
+    calculator_tool,
+    plot_tool,
+    plot_batch_tool,
+    data_analysis_tool,
+    file_reader_tool,
+    code_executor_tool,
+    weather_tool,
+    summarize_tool,
+    pdf_reader_tool,
+    url_pdf_reader_tool,
+    web_fetch_tool,
+    artifact_reader_tool
+]
 
-AVAILABLE TOOLS:
-1. wiki_tool: Query Wikipedia for information
-2. search_tool: Search the web using DuckDuckGo
-3. save_tool: Save content to a text file (params: data, filename)
-4. calculator_tool: Perform mathematical calculations (params: expression)
-5. plot_tool: Create data visualizations (params: data_dict, plot_type, title, filename)
-6. data_analysis_tool: Analyze datasets and compute statistics (params: data, analysis_type)
-7. file_reader_tool: Read content from existing text files (params: filename)
-8. code_executor_tool: Execute Python code safely (params: code)
-9. weather_tool: Get current weather information (params: location)
-10. summarize_tool: Summarize long text content (params: text, max_length)
-11. pdf_reader_tool: Read and extract text from PDF files (params: pdf_path)
-12. url_pdf_reader_tool: Download and read PDF from URL (params: url)
+# Static system prompt: identical on every call so it can be served from the
+# provider's prompt cache. Tool names and parameters come from the bound tool
+# schemas, so they are not repeated here.
+SYSTEM_PROMPT = """You are an advanced research and analysis assistant with multiple capabilities.
 
 INSTRUCTIONS:
-- Use the appropriate tools to complete the user's request
-- For calculations or code: use calculator_tool or code_executor_tool
-- For data visualization: use plot_tool with proper JSON format
-- For file operations: use save_tool or file_reader_tool
-- For PDF files: use pdf_reader_tool (local) or url_pdf_reader_tool (URL)
+- Use the available tools to complete the user's request
 - Chain tools together when needed for complex tasks
 - After completing the task, provide a clear summary of what you did
 
-IMPORTANT:
-- All output files (plots, saved data) will be automatically saved to: {output_folder}
-- When using save_tool or plot_tool, just provide the filename (e.g., "results.txt")
-- The system will automatically place it in the correct output folder
+OUTPUT FILES:
+- Files written by tools (plots, saved data) are automatically placed in the session output folder
+- When a tool asks for a filename, just provide the name (e.g., "results.txt")
 - For plots, use descriptive filenames like "fibonacci_growth.png"
+- JSON parameters (like plot data) must be valid JSON strings, e.g. '{"x": [1,2,3], "y": [4,5,6]}'
 
-IMPORTANT FOR PLOTS:
-- The data_dict parameter must be a valid JSON string
-- Example: '{{"x": [1,2,3], "y": [4,5,6]}}'
-- For bar charts: '{{"labels": ["A","B","C"], "values": [10,20,30]}}'
+Be efficient and direct. Complete the task, then summarize your actions."""
 
-Be efficient and direct. Complete the task, then summarize your actions.
-"""
-    
+def parse_args():
+    parser = argparse.ArgumentParser(description="Advanced Research Agent")
+    parser.add_argument(
+        "--resume",
+        metavar="SESSION",
+        help="Resume an interrupted session (folder name under outputs/ or its path)"
+    )
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="Record every LLM response and external call to cassette.json in the session folder"
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="CASSETTE",
+        help="Re-run a recorded session offline, serving external calls from a cassette"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write CPU hot-spot, collapsed-stack and memory reports to the session folder"
+    )
+    return parser.parse_args()
+
+def print_banner():
     print("=" * 70)
     print("🤖 ADVANCED RESEARCH AGENT")
     print("=" * 70)
@@ -143,27 +157,94 @@ Be efficient and direct. Complete the task, then summarize your actions.
     print("  - 'Read PDF from path /path/to/file.pdf and summarize'")
     print("  - 'Download PDF from https://example.com/paper.pdf and analyze'")
     print("=" * 70)
+
+def run_session(user_input: str = None, resume: str = None, output_root: str = "outputs",
+                record: bool = False, replay: str = None, profile: bool = False):
+    """
+    Run one agent session (or resume an interrupted one) and write its summary.
+    Returns the session output folder, or None if the session failed.
+    """
+    if replay:
+        # LLM responses come from the cassette, no real key is needed
+        os.environ.setdefault("OPENAI_API_KEY", "replay-offline")
     
-    user_input = input("\n📝 Enter your query: ")
+    # Fast model for tool selection, strong model for the final answer
+    llm = build_router_from_env()
+    reset_backends()
+    
+    output_folder = None
+    checkpointer = None
+    profiler = None
     
     try:
-        # Create output folder for this session
-        output_folder = create_output_folder(user_input)
-        print(f"\n📁 Output folder created: {output_folder}")
+        if resume:
+            # Reuse the folder, query and tool subset of the interrupted session
+            output_folder = resolve_session_folder(resume)
+            meta = load_session_meta(output_folder)
+            user_input = meta["query"]
+            tools = [t for t in TOOLS if t.name in meta["tools"]]
+            print(f"\n♻️  Resuming session: {output_folder}")
+            print(f"📝 Query: {user_input}")
+        else:
+            # Create output folder for this session
+            output_folder = create_output_folder(user_input, output_root)
+            print(f"\n📁 Output folder created: {output_folder}")
+            
+            # Bind only the tools relevant to this query
+            tools = select_tools(user_input, TOOLS)
+            save_session_meta(output_folder, user_input, tools)
         
         # Set output folder as environment variable for tools to use
         os.environ['AGENT_OUTPUT_FOLDER'] = output_folder
         
-        # Combine system prompt with user query
-        full_query = system_prompt.replace("{output_folder}", output_folder) + f"\n\nUser request: {user_input}"
+        if profile:
+            # Imported here so normal runs carry no profiling code at all
+            from profiling import SessionProfiler
+            profiler = SessionProfiler()
+            profiler.start()
+            print("🔬 Profiling enabled (cProfile + tracemalloc)")
+        
+        if replay:
+            cassette.start("replay", replay)
+            print(f"📼 Replaying external calls from: {replay}")
+        elif record:
+            cassette.start("record", os.path.join(output_folder, cassette.CASSETTE_FILE), user_input)
+            print(f"📼 Recording external calls to: {cassette.get_active().path}")
+        
+        tool_tokens = estimate_tool_tokens(tools)
+        all_tool_tokens = estimate_tool_tokens(TOOLS)
+        print(f"🧰 Tools bound: {', '.join(t.name for t in tools)}")
+        print(f"   Tool schemas: ~{tool_tokens} tokens per step "
+              f"(all {len(TOOLS)} tools: ~{all_tool_tokens})")
+        
+        if any(t.name == "plot_batch_tool" for t in tools):
+            # Start the plot workers while the model works out what to plot
+            warm_pool()
         
-        print("\n⚙️  Processing your request...\n")
+        # Every completed step is checkpointed to the session folder
+        checkpointer = open_checkpointer(output_folder)
+        agent = create_react_agent(llm, tools, checkpointer=checkpointer)
+        config = {
+            "recursion_limit": 50,
+            "configurable": {"thread_id": session_thread_id(output_folder)}
+        }
         
-        # Invoke agent with increased recursion limit
-        result = agent.invoke(
-            {"messages": [("user", full_query)]},
-            config={"recursion_limit": 50}
-        )
+        state = agent.get_state(config) if resume else None
+        if state is not None and state.values and not state.next:
+            print("\n✅ Session already completed, showing saved results...\n")
+            result = state.values
+        elif state is not None and state.values:
+            step = (state.metadata or {}).get("step", "?")
+            print(f"\n⚙️  Continuing from step {step}...\n")
+            result = agent.invoke(None, config=config)
+        else:
+            print("\n⚙️  Processing your request...\n")
+            
+            # Invoke agent with increased recursion limit
+            result = agent.invoke(
+                {"messages": [SystemMessage(content=SYSTEM_PROMPT), HumanMessage(content=user_input)]},
+                config=config
+            )
         
         # Display agent reasoning steps
         print("\n" + "=" * 70)
@@ -201,17 +282,61 @@ Be efficient and direct. Complete the task, then summarize your actions.
             f.write(f"{'=' * 50}\n\n")
             f.write(f"Tool Calls: {tool_calls}\n")
             f.write(f"Output Folder: {output_folder}\n")
+            f.write(f"Tools Bound: {', '.join(t.name for t in tools)}\n")
+            f.write(f"Tool Schema Tokens: ~{tool_tokens} per step (all tools: ~{all_tool_tokens})\n")
+            f.write(f"Content Dedup: {dedup_summary(output_folder)}\n\n")
+            f.write(f"{'=' * 50}\n\n")
+            f.write(f"Model Routing:\n{llm.stats.summary()}\n\n")
+            f.write(f"{'=' * 50}\n\n")
+            f.write(f"Backend Health:\n{metrics_summary()}\n")
         
+        print("\n" + "=" * 70)
+        print("🧭 MODEL ROUTING:")
+        print("=" * 70)
+        print(llm.stats.summary())
+        print(f"\n♻️  Content dedup: {dedup_summary(output_folder)}")
+        print("\n🛡️  Backend health:")
+        print(metrics_summary())
+
         print("\n" + "=" * 70)
         print(f"✅ Task completed successfully!")
         print(f"📁 All outputs saved to: {output_folder}")
         print(f"📄 Session summary: {summary_path}")
         print("=" * 70)
+        return output_folder
         
     except Exception as e:
         print(f"\n❌ Error occurred: {e}")
         import traceback
         traceback.print_exc()
+        if checkpointer is not None:
+            # The full path: --resume only looks up bare names under outputs/
+            print(f"\n♻️  Progress is checkpointed. Resume with: "
+                  f"python main.py --resume {output_folder}")
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            print("\n🔬 Profile reports:")
+            for path in profiler.write_reports(output_folder):
+                print(f"  • {path}")
+        cassette.stop()
+        if checkpointer is not None:
+            checkpointer.conn.close()
+    return None
+
+def main():
+    args = parse_args()
+    print_banner()
+    
+    if args.resume:
+        run_session(resume=args.resume, profile=args.profile)
+    elif args.replay:
+        user_input = cassette.load_query(args.replay)
+        print(f"\n📝 Query: {user_input}")
+        run_session(user_input, replay=args.replay, profile=args.profile)
+    else:
+        user_input = input("\n📝 Enter your query: ")
+        run_session(user_input, record=args.record, profile=args.profile)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,225 @@
+"""
+Figure rendering for plot_tool and plot_batch_tool.
+
+Figures are built with the object-oriented matplotlib API (Figure + Agg
+canvas) instead of pyplot, so no global figure state is shared and several
+figures can be rendered at once. Batches are rendered in a pool of worker
+processes, one figure per task. Starting the pool takes longer than
+rendering a few figures, so it is warmed in the background as soon as
+plot_batch_tool is bound (warm_pool), and small batches that arrive before
+it is ready are rendered in-process instead.
+"""
+
+import atexit
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+from matplotlib.figure import Figure
+
+PLOT_TYPES = ("line", "bar", "scatter", "pie", "histogram")
+
+# Shared styling; a batch can override any of these
+DEFAULT_STYLE = {
+    "figsize": [10, 6],
+    "dpi": 300,
+    "color": None,          # overrides the per-plot-type main color
+    "label_fontsize": 12,
+    "title_fontsize": 14,
+    "grid_alpha": 0.3,
+}
+
+
+def render_figure(data: Dict, plot_type: str, title: str, filepath: str,
+                  style: Optional[Dict] = None) -> str:
+    """Render one figure to `filepath` and return the path"""
+    style = {**DEFAULT_STYLE, **(style or {})}
+    if plot_type not in PLOT_TYPES:
+        raise ValueError(f"Unknown plot_type '{plot_type}', use one of: {', '.join(PLOT_TYPES)}")
+
+    fig = Figure(figsize=tuple(style["figsize"]))
+    ax = fig.add_subplot()
+    fontsize = style["label_fontsize"]
+    color = style["color"]
+
+    if plot_type == "line":
+        x_data = data.get("x", list(range(len(data["y"]))))
+        ax.plot(x_data, data["y"], marker='o', linewidth=2, markersize=8, color=color)
+        ax.set_xlabel(data.get("xlabel", "X"), fontsize=fontsize)
+        ax.set_ylabel(data.get("ylabel", "Y"), fontsize=fontsize)
+        ax.grid(True, alpha=style["grid_alpha"])
+
+    elif plot_type == "bar":
+        labels = data.get("labels", data.get("x", []))
+        values = data.get("values", data.get("y", []))
+        ax.bar(labels, values, color=color or 'skyblue', edgecolor='navy', alpha=0.7)
+        ax.set_xlabel(data.get("xlabel", "Categories"), fontsize=fontsize)
+        ax.set_ylabel(data.get("ylabel", "Values"), fontsize=fontsize)
+        for label in ax.get_xticklabels():
+            label.set_rotation(45)
+            label.set_horizontalalignment('right')
+        ax.grid(True, alpha=style["grid_alpha"], axis='y')
+
+    elif plot_type == "scatter":
+        ax.scatter(data["x"], data["y"], alpha=0.6, s=100, c=color or 'coral', edgecolors='darkred')
+        ax.set_xlabel(data.get("xlabel", "X"), fontsize=fontsize)
+        ax.set_ylabel(data.get("ylabel", "Y"), fontsize=fontsize)
+        ax.grid(True, alpha=style["grid_alpha"])
+
+    elif plot_type == "pie":
+        labels = data.get("labels", [])
+        values = data.get("values", [])
+        ax.pie(values, labels=labels, autopct='%1.1f%%', startangle=90)
+
+    elif plot_type == "histogram":
+        ax.hist(data["values"], bins=data.get("bins", 10),
+                color=color or 'lightgreen', edgecolor='darkgreen', alpha=0.7)
+        ax.set_xlabel(data.get("xlabel", "Values"), fontsize=fontsize)
+        ax.set_ylabel(data.get("ylabel", "Frequency"), fontsize=fontsize)
+        ax.grid(True, alpha=style["grid_alpha"], axis='y')
+
+    ax.set_title(title, fontsize=style["title_fontsize"], fontweight='bold')
+    fig.tight_layout()
+    fig.savefig(filepath, dpi=style["dpi"], bbox_inches='tight')
+    return filepath
+
+
+def _render_spec(args: Tuple[Dict, str, Dict]) -> Tuple[str, Optional[str], Optional[str]]:
+    """Worker entry point: returns (filename, path, error)"""
+    spec, output_folder, style = args
+    filename = spec.get("filename", "plot.png")
+    try:
+        data = spec.get("data", spec.get("data_dict", {}))
+        if isinstance(data, str):
+            data = json.loads(data)
+        path = render_figure(
+            data,
+            spec.get("plot_type", "line"),
+            spec.get("title", "Data Visualization"),
+            os.path.join(output_folder, filename),
+            style,
+        )
+        return filename, path, None
+    except Exception as e:
+        return filename, None, str(e)
+
+
+def get_max_workers() -> int:
+    return int(os.environ.get("AGENT_PLOT_WORKERS", "4"))
+
+
+def get_start_method() -> str:
+    """
+    Worker start method (AGENT_PLOT_START_METHOD). Defaults to forkserver:
+    workers are forked from a clean helper process instead of the agent,
+    whose other tool threads (and the profiler's sampler) may hold locks a
+    forked child would inherit in the locked state. fork is opt-in.
+    """
+    method = os.environ.get("AGENT_PLOT_START_METHOD")
+    if method:
+        return method
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+# Batches up to this size are rendered in-process while the pool warms up
+COLD_BATCH_MAX = 8
+
+# Shared worker pool, keyed on (workers, start method)
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_key: Optional[Tuple[int, str]] = None
+_pool_ready = threading.Event()
+_pool_lock = threading.Lock()
+
+
+def _pool_settings() -> Tuple[int, str]:
+    return min(get_max_workers(), os.cpu_count() or 1), get_start_method()
+
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+def _warm(pool: ProcessPoolExecutor, workers: int, ready: threading.Event) -> None:
+    try:
+        # While no worker is idle, every submit starts another process
+        for future in [pool.submit(_worker_pid) for _ in range(workers)]:
+            future.result()
+        ready.set()
+    except Exception:
+        pass    # broken or shut down; batches keep rendering in-process
+
+
+def _start_pool(workers: int, method: str) -> None:
+    """Replace the shared pool and warm it in the background. Needs _pool_lock."""
+    global _pool, _pool_key, _pool_ready
+    if _pool is not None:
+        _pool.shutdown(wait=False)
+    context = multiprocessing.get_context(method)
+    if method == "forkserver":
+        # The helper only needs matplotlib. Each worker still re-runs the
+        # launching script (main.py, with LangChain) before its first task,
+        # which is why the pool is warmed ahead of the first batch.
+        context.set_forkserver_preload([__name__])
+    _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    _pool_key = (workers, method)
+    _pool_ready = threading.Event()
+    threading.Thread(target=_warm, args=(_pool, workers, _pool_ready),
+                     name="plot-pool-warmup", daemon=True).start()
+
+
+def warm_pool() -> None:
+    """Start the worker pool in the background, if it is not running yet."""
+    workers, method = _pool_settings()
+    if workers <= 1:
+        return
+    with _pool_lock:
+        if _pool is None or _pool_key != (workers, method):
+            _start_pool(workers, method)
+
+
+def shutdown_pool() -> None:
+    """Stop the shared worker pool (also done at interpreter exit)."""
+    global _pool, _pool_key, _pool_ready
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool, _pool_key, _pool_ready = None, None, threading.Event()
+
+
+atexit.register(shutdown_pool)
+
+
+def render_batch(specs: List[Dict], output_folder: str,
+                 style: Optional[Dict] = None) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Render several figure specs, in parallel worker processes when there is
+    more than one and the pool is warm (or the batch is too big to wait for
+    it). Results are (filename, path, error) in input order.
+    """
+    jobs = [(spec, output_folder, style or {}) for spec in specs]
+    workers = min(len(jobs), get_max_workers(), os.cpu_count() or 1)
+    if workers <= 1:
+        return [_render_spec(job) for job in jobs]
+
+    if not _pool_ready.is_set() and len(jobs) <= COLD_BATCH_MAX:
+        # Render here, then start the pool for later batches: warming it
+        # now would compete with these renders for the CPU
+        results = [_render_spec(job) for job in jobs]
+        warm_pool()
+        return results
+
+    # The pool is sized for the configured maximum, not this batch, so
+    # batches of different sizes share it
+    warm_pool()
+    with _pool_lock:
+        pool = _pool
+    try:
+        return list(pool.map(_render_spec, jobs))
+    except BrokenProcessPool:
+        # A worker died; start a fresh pool on the next batch
+        shutdown_pool()
+        raise
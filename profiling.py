@@ -0,0 +1,200 @@
+"""
+Per-session CPU and memory profiling (python main.py --profile).
+
+LangGraph runs tool calls in worker threads, so profiling only the main
+thread would miss exactly the code of interest (PDF extraction, plotting,
+code_executor_tool). The profiler therefore:
+  - runs cProfile in the main thread and in every thread started while it
+    is active (bootstrapped through threading.setprofile). From Python 3.12
+    cProfile is built on sys.monitoring, which allows one profiler per
+    process but sees every thread, so a single process-wide profile is used
+    there instead
+  - samples the stacks of all threads every few milliseconds, for a
+    collapsed-stack file that flamegraph.pl / speedscope can read
+  - traces allocations with tracemalloc
+
+Reports written to the session folder:
+  profile_hotspots.txt     cProfile functions sorted by cumulative and own time
+  profile_stacks.collapsed sampled stacks, one "frame;frame;frame count" per line
+  profile_memory.txt       peak memory and top allocation sites
+
+This module is only imported when profiling is requested, so normal runs
+pay nothing for it.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import List
+
+# Python 3.12+ allows only one active cProfile per process
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+HOTSPOTS_FILE = "profile_hotspots.txt"
+STACKS_FILE = "profile_stacks.collapsed"
+MEMORY_FILE = "profile_memory.txt"
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SessionProfiler:
+    """cProfile + stack sampling + tracemalloc for one agent run"""
+
+    def __init__(self, sample_interval: float = 0.005, top: int = 40):
+        self.sample_interval = sample_interval
+        self.top = top
+        self.profiles = []          # (thread, cProfile.Profile)
+        self.lock = threading.Lock()
+        self.stacks = Counter()
+        self.samples = 0
+        self.running = False
+        self.sampler = None
+        self.snapshot = None
+        self.peak_memory = 0
+        self.wall_time = 0.0
+
+    # -- thread bootstrap ---------------------------------------------------
+
+    def _bootstrap(self, frame, event, arg):
+        """First profile event in a new thread: give the thread its own cProfile"""
+        profile = cProfile.Profile()
+        with self.lock:
+            self.profiles.append((threading.current_thread(), profile))
+        profile.enable()
+
+    # -- stack sampling -----------------------------------------------------
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        names = {}
+        while self.running:
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+            time.sleep(self.sample_interval)
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def start(self):
+        self.started = time.perf_counter()
+        tracemalloc.start(25)
+
+        # Sampler first, so it is not itself picked up by the thread bootstrap
+        self.running = True
+        self.sampler = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+        self.sampler.start()
+
+        if PER_THREAD_PROFILES:
+            threading.setprofile(self._bootstrap)
+        main_profile = cProfile.Profile()
+        with self.lock:
+            self.profiles.append((threading.current_thread(), main_profile))
+        main_profile.enable()
+
+    def stop(self):
+        if PER_THREAD_PROFILES:
+            threading.setprofile(None)
+        with self.lock:
+            self.profiles[0][1].disable()
+
+        self.running = False
+        self.sampler.join()
+
+        self.snapshot = tracemalloc.take_snapshot()
+        self.peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.wall_time = time.perf_counter() - self.started
+
+    # -- reports ------------------------------------------------------------
+
+    def _hotspots(self) -> str:
+        stats = None
+        skipped = 0
+        with self.lock:
+            profiles = list(self.profiles)
+        for thread, profile in profiles:
+            # Threads still running keep writing to their profile; skip them
+            if thread is not threading.current_thread() and thread.is_alive():
+                skipped += 1
+                continue
+            profile.disable()
+            if stats is None:
+                stats = pstats.Stats(profile, stream=io.StringIO())
+            else:
+                stats.add(profile)
+
+        out = io.StringIO()
+        out.write(f"Session Profile\n{'=' * 50}\n\n")
+        out.write(f"Wall time: {self.wall_time:.2f}s\n")
+        if PER_THREAD_PROFILES:
+            out.write(f"Threads profiled: {len(profiles) - skipped}")
+            out.write(f" ({skipped} still running, skipped)\n\n" if skipped else "\n\n")
+        else:
+            out.write("Threads profiled: all (one process-wide profile; call counts are exact, "
+                      "times of code running in several threads at once are approximate, "
+                      f"see {STACKS_FILE})\n\n")
+
+        for key, heading in (("cumulative", "BY CUMULATIVE TIME"), ("tottime", "BY OWN TIME")):
+            out.write(f"{'=' * 50}\n{heading}\n{'=' * 50}\n")
+            stats.stream = out
+            stats.sort_stats(key).print_stats(self.top)
+        return out.getvalue()
+
+    def _memory(self) -> str:
+        snapshot = self.snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+
+        out = io.StringIO()
+        out.write(f"Memory Profile\n{'=' * 50}\n\n")
+        out.write(f"Peak traced memory: {self.peak_memory / 1024 / 1024:.1f} MiB\n\n")
+
+        out.write(f"{'=' * 50}\nTOP ALLOCATION SITES (still allocated at end of run)\n{'=' * 50}\n")
+        for i, stat in enumerate(snapshot.statistics("lineno")[:25], 1):
+            frame = stat.traceback[0]
+            out.write(f"{i:>3}. {stat.size / 1024:>10.1f} KiB  {stat.count:>7} blocks  "
+                      f"{frame.filename}:{frame.lineno}\n")
+
+        out.write(f"\n{'=' * 50}\nTOP ALLOCATION TRACEBACKS\n{'=' * 50}\n")
+        for i, stat in enumerate(snapshot.statistics("traceback")[:5], 1):
+            out.write(f"\n#{i}: {stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+            for line in stat.traceback.format(limit=10):
+                out.write(f"{line}\n")
+        return out.getvalue()
+
+    def write_reports(self, folder: str) -> List[str]:
+        """Write the three report files into `folder` and return their paths"""
+        os.makedirs(folder, exist_ok=True)
+        paths = []
+
+        for name, content in (
+            (HOTSPOTS_FILE, self._hotspots()),
+            (STACKS_FILE, "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())),
+            (MEMORY_FILE, self._memory()),
+        ):
+            path = os.path.join(folder, name)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+            paths.append(path)
+        return paths
@@ -0,0 +1,333 @@
+"""
+Shared resilience layer for network tools and the LLM.
+
+Every external backend (DuckDuckGo, Wikipedia, PDF downloads, web pages,
+OpenAI) gets:
+  - an adaptive token-bucket rate limiter: the rate halves when the backend
+    answers 429 and recovers gradually on success
+  - retries with jittered exponential backoff (honoring Retry-After)
+  - a circuit breaker that fails fast after repeated failures, instead of
+    letting the agent burn steps on a backend that is down
+
+Per-backend metrics (calls, retries, latency percentiles, breaker state)
+are collected for the session summary.
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import cassette
+
+# name -> (requests per second, burst capacity)
+BACKEND_DEFAULTS = {
+    "duckduckgo": (1.0, 2),
+    "wikipedia": (3.0, 5),
+    "pdf": (2.0, 2),
+    "web": (5.0, 5),
+    "openai": (5.0, 10),
+}
+_DEFAULT_LIMITS = (5.0, 5)
+
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+_RETRYABLE_NAMES = ("ratelimit", "timeout", "connectionerror", "apiconnection",
+                    "internalserver", "serviceunavailable")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend whose circuit breaker is open"""
+
+
+def _status_code(exc: Exception) -> Optional[int]:
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None) or getattr(exc, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_rate_limited(exc: Exception) -> bool:
+    name = type(exc).__name__.lower()
+    message = str(exc).lower()
+    return (_status_code(exc) == 429 or "ratelimit" in name
+            or "ratelimit" in message or "too many requests" in message)
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Rate limits, timeouts, connection errors and 5xx responses are retried"""
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if _status_code(exc) in RETRYABLE_STATUS:
+        return True
+    name = type(exc).__name__.lower()
+    return is_rate_limited(exc) or any(marker in name for marker in _RETRYABLE_NAMES)
+
+
+def _retry_after(exc: Exception) -> float:
+    """Seconds requested by a Retry-After header, 0 if absent"""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class TokenBucket:
+    """Token bucket whose refill rate adapts to the backend's rate limiting"""
+
+    def __init__(self, rate: float, capacity: int, min_rate: Optional[float] = None):
+        self.max_rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 8
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> float:
+        """Block until a token is available; returns the time spent waiting"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def slow_down(self):
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def speed_up(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `threshold` consecutive failures -> half_open after
+    `reset_timeout`. In half_open a single probe call is let through; other
+    callers fail fast until the probe closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self.state = "closed"
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+            if self.state == "half_open":
+                if self.probing:
+                    return False
+                self.probing = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.state = "closed"
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if self.state == "half_open" or self.failures >= self.threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """End a probe that said nothing about backend health (e.g. a 404)"""
+        with self.lock:
+            self.probing = False
+
+    def retry_in(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+class Backend:
+    """Rate limiter, retry policy, circuit breaker and metrics for one backend"""
+
+    def __init__(self, name: str, rate: float, capacity: int, attempts: int = 3,
+                 base_delay: float = 0.5, max_delay: float = 20.0,
+                 breaker_threshold: int = 5, breaker_reset: float = 30.0):
+        self.name = name
+        self.bucket = TokenBucket(rate, capacity)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.short_circuited = 0
+        self.throttle_wait = 0.0
+        self.latencies: List[float] = []
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """
+        Call fn through the rate limiter, retry policy and circuit breaker.
+        With an active cassette the outcome is recorded, or served from the
+        cassette without calling fn at all.
+        """
+        tape = cassette.get_active()
+        if tape is not None and tape.mode == "replay":
+            return tape.replay(self.name, args)
+
+        try:
+            result = self._call(fn, *args, **kwargs)
+        except Exception as e:
+            if tape is not None:
+                tape.record(self.name, args, error=e)
+            raise
+        if tape is not None:
+            tape.record(self.name, args, result)
+        return result
+
+    def _call(self, fn: Callable, *args, **kwargs):
+        if not self.breaker.allow():
+            with self.lock:
+                self.short_circuited += 1
+            if self.breaker.state == "half_open":
+                raise CircuitOpenError(f"{self.name} is unavailable (circuit half-open, "
+                                       f"recovery probe in progress)")
+            raise CircuitOpenError(
+                f"{self.name} is unavailable (circuit open), "
+                f"retry in {self.breaker.retry_in():.0f}s"
+            )
+
+        start = time.perf_counter()
+        with self.lock:
+            self.calls += 1
+
+        for attempt in range(self.attempts):
+            waited = self.bucket.acquire()
+            with self.lock:
+                self.throttle_wait += waited
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if is_rate_limited(e):
+                    self.bucket.slow_down()
+                    with self.lock:
+                        self.rate_limited += 1
+
+                retryable = is_retryable(e)
+                retry_after = _retry_after(e)
+                # A server asking for a longer pause than max_delay would stall
+                # the tool thread, so that fails fast instead of sleeping
+                if not retryable or attempt == self.attempts - 1 or retry_after > self.max_delay:
+                    # Bad input (404, parse errors) says nothing about backend health
+                    if retryable:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.release()
+                    with self.lock:
+                        self.failures += 1
+                        self.latencies.append(time.perf_counter() - start)
+                    raise
+
+                # Full jitter backoff, but never sooner than Retry-After
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                time.sleep(max(delay, retry_after))
+                with self.lock:
+                    self.retries += 1
+                continue
+
+            self.breaker.record_success()
+            self.bucket.speed_up()
+            with self.lock:
+                self.latencies.append(time.perf_counter() - start)
+            return result
+
+    def metrics(self) -> Dict:
+        with self.lock:
+            latencies = sorted(self.latencies)
+            return {
+                "calls": self.calls,
+                "failures": self.failures,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "short_circuited": self.short_circuited,
+                "throttle_wait": self.throttle_wait,
+                "p50": _percentile(latencies, 50),
+                "p95": _percentile(latencies, 95),
+                "rate": self.bucket.rate,
+                "breaker": self.breaker.state,
+            }
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile, 0 for an empty list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+_backends: Dict[str, Backend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name: str) -> Backend:
+    """
+    Shared Backend for a name. Names like "web:example.com" inherit the
+    limits of their prefix ("web"). Retry and breaker settings come from
+    AGENT_RETRY_ATTEMPTS, AGENT_BREAKER_THRESHOLD and AGENT_BREAKER_RESET.
+    """
+    with _backends_lock:
+        if name not in _backends:
+            rate, capacity = BACKEND_DEFAULTS.get(name.split(":")[0], _DEFAULT_LIMITS)
+            _backends[name] = Backend(
+                name, rate, capacity,
+                attempts=int(os.environ.get("AGENT_RETRY_ATTEMPTS", "3")),
+                breaker_threshold=int(os.environ.get("AGENT_BREAKER_THRESHOLD", "5")),
+                breaker_reset=float(os.environ.get("AGENT_BREAKER_RESET", "30")),
+            )
+        return _backends[name]
+
+
+def reset_backends() -> None:
+    with _backends_lock:
+        _backends.clear()
+
+
+def metrics_summary() -> str:
+    """Human-readable per-backend metrics for the session log"""
+    with _backends_lock:
+        backends = list(_backends.values())
+    if not backends:
+        return "No external calls made"
+
+    lines = []
+    for backend in backends:
+        m = backend.metrics()
+        lines.append(
+            f"  • {backend.name}: {m['calls']} calls, {m['failures']} failed, "
+            f"{m['retries']} retries, {m['rate_limited']} rate-limited, "
+            f"{m['short_circuited']} short-circuited | "
+            f"p50 {m['p50']:.2f}s, p95 {m['p95']:.2f}s, "
+            f"throttled {m['throttle_wait']:.2f}s | "
+            f"rate {m['rate']:.2f}/s, breaker {m['breaker']}"
+        )
+    return "\n".join(lines)
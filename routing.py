@@ -0,0 +1,216 @@
+"""
+Model routing for the research agent.
+
+Intermediate steps (deciding which tool to call next) are served by a
+fast/cheap model at low temperature. The stronger model is only used to
+write the final answer, or when a step looks hard (a tool just failed, or
+the run has gone on for many steps).
+
+Both models are injected, so the router can be exercised offline with any
+LangChain fake chat model.
+"""
+
+import logging
+import os
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, ToolMessage
+from langchain_core.messages.utils import message_chunk_to_message
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from resilience import get_backend
+
+logger = logging.getLogger(__name__)
+
+# Markers used by tools.py when a tool call fails
+ERROR_MARKERS = ("❌", "error:")
+
+
+class RoutingStats:
+    """Routing decisions and per-model latency collected during a session"""
+
+    def __init__(self):
+        self.decisions = []
+
+    def record(self, step: int, model: str, reason: str, latency: float):
+        self.decisions.append({
+            "step": step,
+            "model": model,
+            "reason": reason,
+            "latency": latency,
+        })
+        logger.info("route step=%d model=%s reason=%s latency=%.2fs",
+                    step, model, reason, latency)
+
+    def summary(self) -> str:
+        """Human-readable per-model summary for the session log"""
+        if not self.decisions:
+            return "No model calls recorded"
+
+        per_model = {}
+        for d in self.decisions:
+            entry = per_model.setdefault(d["model"], {"calls": 0, "latency": 0.0})
+            entry["calls"] += 1
+            entry["latency"] += d["latency"]
+
+        lines = []
+        for model, entry in per_model.items():
+            avg = entry["latency"] / entry["calls"]
+            lines.append(
+                f"  • {model}: {entry['calls']} calls, "
+                f"{entry['latency']:.2f}s total, {avg:.2f}s avg"
+            )
+        lines.append("Decisions:")
+        for d in self.decisions:
+            lines.append(
+                f"  [Step {d['step']}] {d['model']} ({d['reason']}) {d['latency']:.2f}s"
+            )
+        return "\n".join(lines)
+
+
+def _invoke(model: Any, messages: List[BaseMessage]) -> AIMessage:
+    return model.invoke(messages)
+
+
+def _probe(model: Any, messages: List[BaseMessage]) -> AIMessage:
+    """Stream `model`, stopping as soon as it starts a text answer"""
+    stream = model.stream(messages)
+    acc = None
+    try:
+        for chunk in stream:
+            if not isinstance(chunk, AIMessageChunk):
+                return chunk    # no streaming support: one complete message
+            acc = chunk if acc is None else acc + chunk
+            if (not acc.tool_call_chunks and isinstance(acc.content, str)
+                    and acc.content.strip()):
+                break
+    finally:
+        stream.close()
+    return message_chunk_to_message(acc) if acc is not None else AIMessage(content="")
+
+
+def _model_name(model: Any) -> str:
+    """Best-effort name for a (possibly tool-bound) chat model"""
+    bound = getattr(model, "bound", model)
+    return (getattr(bound, "model_name", None)
+            or getattr(bound, "model", None)
+            or type(bound).__name__)
+
+
+class RoutedChatModel(BaseChatModel):
+    """
+    Chat model that dispatches each agent step to a fast or a strong model.
+
+    Routing rules:
+      - a tool returned an error, or the run reached `escalate_after_steps`
+        -> strong model ("hard-step")
+      - otherwise the fast model picks the next action; if it calls tools
+        its answer is used as-is ("tool-selection")
+      - if the fast model starts a text answer instead, its stream is cut
+        off at the first token ("synthesis-probe") and the strong model
+        writes the final answer ("final-synthesis")
+
+    The fast model is streamed so that deciding "answer now" costs one
+    token rather than a complete throwaway answer. Tool calls are always
+    read to the end, so their arguments are never truncated.
+    """
+
+    fast_model: Any
+    strong_model: Any
+    stats: Any = None
+    escalate_after_steps: int = 12
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        if self.stats is None:
+            self.stats = RoutingStats()
+
+    @property
+    def _llm_type(self) -> str:
+        return "routed-chat"
+
+    def bind_tools(self, tools, **kwargs):
+        """Bind the same tools to both underlying models"""
+        return self.__class__(
+            fast_model=self.fast_model.bind_tools(tools, **kwargs),
+            strong_model=self.strong_model.bind_tools(tools, **kwargs),
+            stats=self.stats,
+            escalate_after_steps=self.escalate_after_steps,
+        )
+
+    def _route(self, messages: List[BaseMessage]) -> Optional[str]:
+        """Return the reason to go straight to the strong model, if any"""
+        step = sum(1 for m in messages if isinstance(m, AIMessage))
+        if step >= self.escalate_after_steps:
+            return "hard-step"
+
+        last = messages[-1] if messages else None
+        if isinstance(last, ToolMessage):
+            content = str(last.content).lower()
+            if any(marker in content[:200] for marker in ERROR_MARKERS):
+                return "hard-step"
+        return None
+
+    def _call(self, model: Any, messages: List[BaseMessage], step: int,
+              reason: str) -> AIMessage:
+        start = time.perf_counter()
+        # The model is passed as an argument so cassettes can tell calls apart
+        response = get_backend("openai").call(_invoke, model, messages)
+        self.stats.record(step, _model_name(model), reason,
+                          time.perf_counter() - start)
+        return response
+
+    def _call_fast(self, messages: List[BaseMessage], step: int) -> AIMessage:
+        start = time.perf_counter()
+        response = get_backend("openai").call(_probe, self.fast_model, messages)
+        reason = "tool-selection" if response.tool_calls else "synthesis-probe"
+        self.stats.record(step, _model_name(self.fast_model), reason,
+                          time.perf_counter() - start)
+        return response
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        step = sum(1 for m in messages if isinstance(m, AIMessage)) + 1
+
+        reason = self._route(messages)
+        if reason:
+            response = self._call(self.strong_model, messages, step, reason)
+        else:
+            response = self._call_fast(messages, step)
+            if not response.tool_calls:
+                response = self._call(self.strong_model, messages, step, "final-synthesis")
+
+        return ChatResult(generations=[ChatGeneration(message=response)])
+
+
+def build_router_from_env() -> RoutedChatModel:
+    """
+    Build the router from environment variables (see README):
+      AGENT_FAST_MODEL, AGENT_FAST_TEMPERATURE,
+      AGENT_STRONG_MODEL, AGENT_STRONG_TEMPERATURE,
+      AGENT_MAX_TOKENS, AGENT_ESCALATE_AFTER_STEPS
+    """
+    from langchain_openai import ChatOpenAI
+
+    max_tokens = int(os.environ.get("AGENT_MAX_TOKENS", "2000"))
+
+    # Retries are handled by the shared resilience layer (see resilience.py)
+    fast = ChatOpenAI(
+        model=os.environ.get("AGENT_FAST_MODEL", "gpt-4o-mini"),
+        temperature=float(os.environ.get("AGENT_FAST_TEMPERATURE", "0.0")),
+        max_tokens=max_tokens,
+        max_retries=0,
+    )
+    strong = ChatOpenAI(
+        model=os.environ.get("AGENT_STRONG_MODEL", "gpt-4o"),
+        temperature=float(os.environ.get("AGENT_STRONG_TEMPERATURE", "0.7")),
+        max_tokens=max_tokens,
+        max_retries=0,
+    )
+    return RoutedChatModel(
+        fast_model=fast,
+        strong_model=strong,
+        escalate_after_steps=int(os.environ.get("AGENT_ESCALATE_AFTER_STEPS", "12")),
+    )
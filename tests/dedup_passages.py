@@ -0,0 +1,143 @@
+"""
+Passages for the near-duplicate recall tests: encyclopedia / search-snippet
+style paragraphs, hand-reworded variants of some of them, and pairs on the
+same topic that must stay distinct.
+"""
+
+PASSAGES = [
+    "Quantum computing is a type of computation whose operations can harness the phenomena "
+    "of quantum mechanics, such as superposition, interference, and entanglement. Devices that "
+    "perform quantum computations are known as quantum computers.",
+
+    "Machine learning is a field of study in artificial intelligence concerned with the "
+    "development and study of statistical algorithms that can learn from data and generalize "
+    "to unseen data, and thus perform tasks without explicit instructions.",
+
+    "Python is a high-level, general-purpose programming language. Its design philosophy "
+    "emphasizes code readability with the use of significant indentation. Python is dynamically "
+    "typed and garbage-collected, and it supports multiple programming paradigms.",
+
+    "The Eiffel Tower is a wrought-iron lattice tower on the Champ de Mars in Paris, France. "
+    "It is named after the engineer Gustave Eiffel, whose company designed and built the tower "
+    "from 1887 to 1889 as the centerpiece of the World's Fair.",
+
+    "Photosynthesis is a biological process used by many cellular organisms to convert light "
+    "energy into chemical energy, which is stored in organic compounds that can later be "
+    "metabolized through cellular respiration to fuel the organism's activities.",
+
+    "The Great Barrier Reef is the world's largest coral reef system, composed of over 2,900 "
+    "individual reefs and 900 islands stretching for over 2,300 kilometres over an area of "
+    "approximately 344,400 square kilometres off the coast of Queensland, Australia.",
+
+    "A black hole is a region of spacetime where gravity is so strong that nothing, including "
+    "light and other electromagnetic waves, is capable of possessing enough energy to escape it. "
+    "Einstein's theory of general relativity predicts that a sufficiently compact mass can "
+    "deform spacetime to form a black hole.",
+
+    "The Industrial Revolution was a period of global transition of the human economy towards "
+    "more widespread, efficient and stable manufacturing processes, succeeding the Agricultural "
+    "Revolution. Beginning in Great Britain, it spread to continental Europe and the United "
+    "States from around 1760 to about 1820.",
+
+    "Climate change includes both global warming driven by human-induced emissions of "
+    "greenhouse gases and the resulting large-scale shifts in weather patterns. Though there "
+    "have been previous periods of climatic change, since the mid-20th century humans have had "
+    "an unprecedented impact on Earth's climate system.",
+
+    "The Fibonacci sequence is a sequence in which each element is the sum of the two elements "
+    "that precede it. Numbers that are part of the Fibonacci sequence are known as Fibonacci "
+    "numbers. Many writers begin the sequence with 0 and 1.",
+
+    "A neural network is a group of interconnected units called neurons that send signals to "
+    "one another. Neurons can be either biological cells or signal pathways. While individual "
+    "neurons are simple, many of them together in a network can perform complex tasks.",
+
+    "The Amazon rainforest is a moist broadleaf tropical rainforest in the Amazon biome that "
+    "covers most of the Amazon basin of South America. This basin encompasses seven million "
+    "square kilometres, of which five and a half million square kilometres are covered by the "
+    "rainforest.",
+
+    "Blockchain is a distributed ledger with growing lists of records that are securely linked "
+    "together via cryptographic hashes. Each block contains a cryptographic hash of the previous "
+    "block, a timestamp, and transaction data.",
+
+    "The Roman Empire was the state ruled by the Romans following Octavian's assumption of sole "
+    "rule under the Principate in 27 BC. At its height it controlled the lands around the "
+    "Mediterranean Sea in Europe, North Africa and Western Asia.",
+
+    "Vaccination is the administration of a vaccine to help the immune system develop immunity "
+    "from a disease. Vaccines contain a microorganism or virus in a weakened, live or killed "
+    "state, or proteins or toxins from the organism.",
+
+    "Rust is a general-purpose programming language emphasizing performance, type safety, and "
+    "concurrency. It enforces memory safety, meaning that all references point to valid memory, "
+    "without a conventional garbage collector.",
+
+    "Compound interest is interest accumulated from a principal sum and previously accumulated "
+    "interest. It is the result of reinvesting or retaining interest that would otherwise be "
+    "paid out, or of the accumulation of debts from a borrower.",
+
+    "Mount Everest is Earth's highest mountain above sea level, located in the Mahalangur Himal "
+    "sub-range of the Himalayas. The China-Nepal border runs across its summit point.",
+
+    "The theory of evolution by natural selection was first formulated in Darwin's book On the "
+    "Origin of Species in 1859. It describes how organisms change over time as a result of "
+    "changes in heritable physical or behavioural traits.",
+
+    "JavaScript is a programming language and core technology of the web, alongside HTML and "
+    "CSS. Ninety-nine percent of websites use JavaScript on the client side for webpage "
+    "behavior, often incorporating third-party libraries.",
+]
+
+# (original, reworded) pairs as they appear across mirrors and search snippets
+REWORDED = [
+    (PASSAGES[0],
+     "Quantum computing is a type of computation that harnesses the phenomena of quantum "
+     "mechanics, such as superposition, interference, and entanglement. Devices that perform "
+     "quantum computations are known as quantum computers."),
+    (PASSAGES[1],
+     "Machine learning (ML) is a field of study in artificial intelligence concerned with the "
+     "development and study of statistical algorithms that can learn from data and generalise "
+     "to unseen data, and thus perform tasks without explicit instructions."),
+    (PASSAGES[2],
+     "Python is a high-level, general purpose programming language. Its design philosophy "
+     "emphasizes code readability through the use of significant indentation. Python is "
+     "dynamically type-checked and garbage-collected and supports multiple programming paradigms."),
+    (PASSAGES[3],
+     "The Eiffel Tower is a wrought-iron lattice tower located on the Champ de Mars in Paris. "
+     "It is named after engineer Gustave Eiffel, whose company designed and built the tower "
+     "between 1887 and 1889 as the centerpiece of the 1889 World's Fair."),
+    (PASSAGES[6],
+     "A black hole is a region of spacetime where gravity is so strong that nothing, not even "
+     "light and other electromagnetic waves, has enough energy to escape it. Einstein's theory "
+     "of general relativity predicts that a sufficiently compact mass can deform spacetime to "
+     "form a black hole."),
+    (PASSAGES[9],
+     "In mathematics, the Fibonacci sequence is a sequence in which each element is the sum of "
+     "the two elements that precede it. Numbers that are part of the Fibonacci sequence are "
+     "known as Fibonacci numbers. Many writers begin the sequence with 0 and 1."),
+]
+
+# Different passages on the same topic, which must never be collapsed
+SAME_TOPIC = [
+    (PASSAGES[0],
+     "Quantum computers are not yet practical for real-world applications. Physically "
+     "engineering high-quality qubits has proven challenging, and national governments have "
+     "invested heavily in experimental research that aims to develop scalable qubits."),
+    (PASSAGES[2],
+     "Guido van Rossum began working on Python in the late 1980s as a successor to the ABC "
+     "programming language, and he first released it in 1991. Python consistently ranks as one "
+     "of the most popular programming languages."),
+    (PASSAGES[9],
+     "The Fibonacci numbers were first described in Indian mathematics as early as 200 BC in "
+     "work by Pingala on enumerating possible patterns of Sanskrit poetry formed from syllables "
+     "of two lengths."),
+    (PASSAGES[10],
+     "Artificial neural networks are used for predictive modeling, adaptive control, and other "
+     "applications where they can be trained via a dataset. They are also used to solve "
+     "problems in artificial intelligence."),
+    (PASSAGES[15],
+     "Rust was influenced by ideas from functional programming, including immutability, "
+     "higher-order functions, algebraic data types, and pattern matching. It also supports "
+     "object-oriented programming via structs, enums, traits, and methods."),
+]
@@ -0,0 +1,74 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tools import ARTIFACT_PREFIX, artifact_reader_tool, spill_large_result
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    monkeypatch.setenv("AGENT_OUTPUT_FOLDER", str(tmp_path))
+    monkeypatch.setenv("AGENT_MAX_TOOL_RESULT_CHARS", "200")
+    return tmp_path
+
+
+def handle_of(preview: str) -> str:
+    return preview.split("stored as artifact: ")[1].split()[0]
+
+
+def test_small_results_pass_through(session):
+    assert spill_large_result("short", "search_tool") == "short"
+    assert not os.path.exists(session / "artifacts")
+
+
+def test_spilled_result_fits_the_limit(session):
+    for size in (1001, 1200, 3000, 100_000):
+        text = ("word " * size)[:size]
+        preview = spill_large_result(text, "web_fetch_page1", limit=1000)
+        assert "stored as artifact" in preview and len(preview) <= 1000
+
+
+def test_text_the_preview_would_not_shorten_passes_through(session):
+    # Over the 200-character limit, but shorter than the artifact message
+    text = "x" * 250
+    assert spill_large_result(text, "search_tool") == text
+    assert not os.path.exists(session / "artifacts")
+
+
+def test_spilled_result_is_readable_in_full(session):
+    text = "".join(f"line {i}\n" for i in range(200))
+    preview = spill_large_result(text, "search_tool")
+
+    assert len(preview) < len(text)
+    handle = handle_of(preview)
+    assert handle.startswith(ARTIFACT_PREFIX)
+    with open(session / "artifacts" / "001_search_tool.txt", encoding="utf-8") as f:
+        assert f.read() == text
+    assert "line 0" in artifact_reader_tool.invoke({"handle": handle, "offset": 0})
+
+
+def test_parallel_spills_never_overwrite_each_other(session, monkeypatch):
+    # Stalling after each directory listing widens the window between
+    # picking a name and creating the file
+    listdir = os.listdir
+
+    def slow_listdir(path):
+        entries = listdir(path)
+        time.sleep(0.002)
+        return entries
+
+    monkeypatch.setattr(os, "listdir", slow_listdir)
+    texts = [f"result {i} " * 100 for i in range(64)]
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        previews = list(pool.map(lambda t: spill_large_result(t, "web_fetch_tool"), texts))
+
+    handles = [handle_of(p) for p in previews]
+    assert len(set(handles)) == 64
+    assert len(os.listdir(session / "artifacts")) == 64
+    for text, handle in zip(texts, handles):
+        path = session / handle[len(ARTIFACT_PREFIX):]
+        with open(path, encoding="utf-8") as f:
+            assert f.read() == text
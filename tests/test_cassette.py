@@ -0,0 +1,87 @@
+"""Record a session with scripted models, then replay it offline"""
+
+import json
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+import cassette
+import main
+from routing import RoutedChatModel
+
+QUERY = "Save the text hello world to hello.txt"
+
+
+class NamedFake(FakeMessagesListChatModel):
+    model_name: str
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+
+def router(fast_responses, strong_responses, **kwargs):
+    return RoutedChatModel(
+        fast_model=NamedFake(model_name="fast", responses=fast_responses),
+        strong_model=NamedFake(model_name="strong", responses=strong_responses),
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def recorded(tmp_path, monkeypatch, capsys):
+    """Path of a cassette recorded from a two-step session"""
+    monkeypatch.setattr(main, "build_router_from_env", lambda: router(
+        [AIMessage(content="", tool_calls=[{
+            "name": "save_tool", "args": {"data": "hello world", "filename": "hello.txt"},
+            "id": "call_1"}]),
+         AIMessage(content="Done.")],
+        [AIMessage(content="Saved hello world to hello.txt.")],
+    ))
+    folder = main.run_session(QUERY, output_root=str(tmp_path / "record"), record=True)
+    assert folder is not None
+    return f"{folder}/{cassette.CASSETTE_FILE}"
+
+
+def replay(path, tmp_path, monkeypatch, **router_kwargs):
+    # Models without responses: every answer has to come from the cassette
+    monkeypatch.setattr(main, "build_router_from_env", lambda: router([], [], **router_kwargs))
+    return main.run_session(cassette.load_query(path), output_root=str(tmp_path / "replay"),
+                            replay=path)
+
+
+def test_llm_calls_are_keyed_on_model_tools_and_conversation(recorded):
+    with open(recorded, encoding="utf-8") as f:
+        keys = [i["key"] for i in json.load(f)["interactions"] if i["backend"] == "openai"]
+
+    assert [k.split("[")[0] for k in keys] == ["fast", "fast", "strong"]
+    assert all("save_tool" in k for k in keys)
+    assert len(set(keys)) == 3
+
+
+def test_replay_serves_the_recorded_session(recorded, tmp_path, monkeypatch, capsys):
+    folder = replay(recorded, tmp_path, monkeypatch)
+
+    assert folder is not None
+    with open(f"{folder}/hello.txt", encoding="utf-8") as f:
+        assert "hello world" in f.read()
+    with open(f"{folder}/session_summary.txt", encoding="utf-8") as f:
+        assert "Saved hello world to hello.txt." in f.read()
+
+
+def test_replay_fails_when_routing_changes(recorded, tmp_path, monkeypatch, capsys):
+    # Escalating every step sends the first call to the strong model
+    assert replay(recorded, tmp_path, monkeypatch, escalate_after_steps=0) is None
+    assert "CassetteMissError" in capsys.readouterr().err
+
+
+def test_replay_fails_when_the_prompt_changes(recorded, tmp_path, monkeypatch, capsys):
+    with open(recorded, encoding="utf-8") as f:
+        data = json.load(f)
+    data["query"] = "Save the text goodbye world to hello.txt"
+    with open(recorded, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+    assert replay(recorded, tmp_path, monkeypatch) is None
+    assert "CassetteMissError" in capsys.readouterr().err
@@ -0,0 +1,80 @@
+"""Crash a session mid-run with scripted models, then resume it from its checkpoints"""
+
+import os
+
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+import main
+from routing import RoutedChatModel
+
+QUERY = "Save the text hello world to hello.txt"
+
+
+class CrashingFake(FakeMessagesListChatModel):
+    model_name: str
+    crash_at: int = -1      # 0-based call that raises instead of answering
+    calls: int = 0
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _generate(self, *args, **kwargs):
+        call, self.calls = self.calls, self.calls + 1
+        if call == self.crash_at:
+            raise RuntimeError("connection to the model dropped")
+        return super()._generate(*args, **kwargs)
+
+
+class SaverFake(CrashingFake):
+    """Calls save_tool until the conversation holds its result, like a real model"""
+
+    responses: list = []
+
+    def _generate(self, messages, *args, **kwargs):
+        done = any(isinstance(m, ToolMessage) for m in messages)
+        self.responses = [AIMessage(content="Done.") if done else AIMessage(
+            content="", tool_calls=[{"name": "save_tool", "id": "call_1",
+                                     "args": {"data": "hello world", "filename": "hello.txt"}}])]
+        self.i = 0
+        return super()._generate(messages, *args, **kwargs)
+
+
+def use_router(monkeypatch, fast, strong):
+    monkeypatch.setattr(main, "build_router_from_env",
+                        lambda: RoutedChatModel(fast_model=fast, strong_model=strong))
+
+
+def saved_count(folder):
+    with open(os.path.join(folder, "hello.txt"), encoding="utf-8") as f:
+        return f.read().count("hello world")
+
+
+def test_resume_after_a_crashed_llm_call_does_not_repeat_finished_tools(
+        tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("AGENT_OUTPUT_FOLDER", str(tmp_path))
+    root = str(tmp_path / "runs")
+
+    # Step 1 calls save_tool; the LLM call of step 2 crashes
+    use_router(monkeypatch, SaverFake(model_name="fast", crash_at=1),
+               CrashingFake(model_name="strong", responses=[AIMessage(content="unused")]))
+    assert main.run_session(QUERY, output_root=root) is None
+
+    (name,) = os.listdir(root)
+    folder = os.path.join(root, name)
+    assert saved_count(folder) == 1
+    # A bare folder name would only be found under outputs/
+    assert f"--resume {folder}" in capsys.readouterr().out
+
+    # Restarting from scratch would call save_tool a second time
+    fast = SaverFake(model_name="fast")
+    strong = CrashingFake(model_name="strong",
+                          responses=[AIMessage(content="Saved hello world to hello.txt.")])
+    use_router(monkeypatch, fast, strong)
+    assert main.run_session(resume=folder) == folder
+
+    assert saved_count(folder) == 1
+    assert fast.calls == 1 and strong.calls == 1
+    with open(os.path.join(folder, "session_summary.txt"), encoding="utf-8") as f:
+        assert "Saved hello world to hello.txt." in f.read()
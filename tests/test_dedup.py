@@ -0,0 +1,120 @@
+import itertools
+import random
+
+import pytest
+
+from dedup import DedupStore, dedup_text
+from dedup_passages import PASSAGES, REWORDED, SAME_TOPIC
+from tools import spill_large_result
+
+FILLER = "river garden silver market window orange thunder pencil harbor violin".split()
+
+
+def substitute(text, count, rng):
+    words = text.split()
+    for i in rng.sample(range(len(words)), count):
+        words[i] = rng.choice(FILLER)
+    return " ".join(words)
+
+
+def delete(text, count, rng):
+    words = text.split()
+    for _ in range(count):
+        words.pop(rng.randrange(len(words)))
+    return " ".join(words)
+
+
+def snippet(text, rng):
+    words = text.split()
+    return " ".join(words[:int(len(words) * 0.7)]) + " ..."
+
+
+def with_citations(text, rng):
+    return text.replace(". ", ".[1] ", 1).replace(", ", ",[2] ", 1)
+
+
+EDITS = {
+    "1 word substituted": lambda t, rng: substitute(t, 1, rng),
+    "3 words substituted": lambda t, rng: substitute(t, 3, rng),
+    "2 words deleted": lambda t, rng: delete(t, 2, rng),
+    "truncated snippet": snippet,
+    "citation markers": with_citations,
+    "first 20 words, 1 substituted": lambda t, rng: substitute(" ".join(t.split()[:20]), 1, rng),
+}
+
+
+def is_collapsed(first, second):
+    store = DedupStore()
+    store.dedup(first, "wiki_tool")
+    return store.dedup(second, "search_tool") == "[≈ repeats wiki_tool result #1]"
+
+
+@pytest.mark.parametrize("edit", EDITS)
+def test_recall_on_edited_passages(edit):
+    rng = random.Random(7)
+    pairs = []
+    for passage in PASSAGES:
+        for _ in range(5):
+            variant = EDITS[edit](passage, rng)
+            original = " ".join(passage.split()[:20]) if edit.startswith("first 20") else passage
+            pairs.append((original, variant))
+
+    recall = sum(is_collapsed(a, b) for a, b in pairs) / len(pairs)
+    assert recall >= 0.95
+
+
+def test_recall_on_reworded_passages():
+    assert all(is_collapsed(a, b) for a, b in REWORDED)
+
+
+def test_distinct_passages_are_kept():
+    pairs = list(itertools.combinations(PASSAGES, 2)) + SAME_TOPIC
+    assert not any(is_collapsed(a, b) for a, b in pairs)
+
+
+def test_repeats_within_one_result_are_collapsed():
+    store = DedupStore()
+    text = f"{PASSAGES[0]}\n{PASSAGES[1]}\n{PASSAGES[0]}"
+    assert store.dedup(text, "search_tool").split("\n") == [
+        PASSAGES[0], PASSAGES[1], "[≈ repeats search_tool result #1]",
+    ]
+
+
+def test_only_the_preview_of_a_spilled_result_counts_as_seen(tmp_path, monkeypatch):
+    monkeypatch.setenv("AGENT_OUTPUT_FOLDER", str(tmp_path))
+    monkeypatch.setenv("AGENT_MAX_TOOL_RESULT_CHARS", "1000")
+    session = str(tmp_path)
+
+    def search(text):
+        return dedup_text(text, "search_tool", session,
+                          bound=lambda t: spill_large_result(t, "search_tool"))
+
+    first = search("\n".join(PASSAGES))
+    assert "stored as artifact" in first
+    assert PASSAGES[0] in first and PASSAGES[10] not in first
+
+    # Shown in the preview: collapsed. Only in the artifact: kept.
+    assert search(PASSAGES[0]) == "[search_tool result #2]\n[≈ repeats search_tool result #1]"
+    assert search(PASSAGES[10]) == f"[search_tool result #3]\n{PASSAGES[10]}"
+
+
+def test_back_references_name_a_label_shown_earlier(tmp_path):
+    session = str(tmp_path)
+    first = dedup_text(f"{PASSAGES[0]}\n{PASSAGES[1]}", "wiki_tool", session)
+    second = dedup_text(f"{REWORDED[0][1]}\n{PASSAGES[2]}", "search_tool", session)
+
+    reference = second.split("\n")[1]
+    assert reference == "[≈ repeats wiki_tool result #1]"
+    assert first.startswith("[wiki_tool result #1]\n")
+    assert second.startswith("[search_tool result #1]\n")
+
+
+def test_pages_are_referred_to_by_their_url(tmp_path):
+    session = str(tmp_path)
+    url = "https://en.wikipedia.org/wiki/Python_(programming_language)"
+    page = dedup_text(PASSAGES[2], "web_fetch_tool", session, label=url)
+    repeat = dedup_text(REWORDED[2][1], "search_tool", session)
+
+    # The page is shown under its URL heading, so it needs no tag
+    assert page == PASSAGES[2]
+    assert repeat.split("\n")[1] == f"[≈ repeats {url}]"
@@ -0,0 +1,116 @@
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+
+import pytest
+
+import plotting
+from plotting import get_start_method, render_batch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SPECS = [
+    {"filename": "line.png", "plot_type": "line", "data": {"y": [1, 4, 9, 16]}},
+    {"filename": "bar.png", "plot_type": "bar", "data": {"labels": ["a", "b"], "values": [3, 5]}},
+    {"filename": "pie.png", "plot_type": "pie", "data": '{"labels": ["x", "y"], "values": [1, 2]}'},
+    {"filename": "bad.png", "plot_type": "radar", "data": {"y": [1]}},
+]
+
+
+def test_default_start_method_avoids_fork(monkeypatch):
+    monkeypatch.delenv("AGENT_PLOT_START_METHOD", raising=False)
+    assert get_start_method() in ("forkserver", "spawn")
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        assert get_start_method() == "forkserver"
+
+    monkeypatch.setenv("AGENT_PLOT_START_METHOD", "fork")
+    assert get_start_method() == "fork"
+
+
+@pytest.fixture
+def pool_path(monkeypatch):
+    """Take the worker-pool path even on a single-CPU machine"""
+    monkeypatch.setattr(plotting.os, "cpu_count", lambda: 4)
+    monkeypatch.delenv("AGENT_PLOT_START_METHOD", raising=False)
+    yield
+    plotting.shutdown_pool()
+
+
+@pytest.mark.parametrize("workers", ["1", "4"])
+def test_batch_renders_every_spec_from_a_worker_thread(tmp_path, monkeypatch, pool_path, workers):
+    monkeypatch.setenv("AGENT_PLOT_WORKERS", workers)
+    style = {"dpi": 50, "figsize": [4, 3]}
+
+    # The agent calls tools from worker threads, while other threads run
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(render_batch(SPECS, str(tmp_path), style)))
+    thread.start()
+    thread.join(timeout=120)
+
+    assert not thread.is_alive()
+    assert [r[0] for r in results] == [s["filename"] for s in SPECS]
+    for filename, path, error in results[:3]:
+        assert error is None and (tmp_path / filename).stat().st_size > 0
+    assert "Unknown plot_type" in results[3][2]
+    assert not (tmp_path / "bad.png").exists()
+
+
+def test_batches_share_one_warm_worker_pool(tmp_path, monkeypatch, pool_path):
+    monkeypatch.setenv("AGENT_PLOT_WORKERS", "2")
+
+    plotting.warm_pool()
+    pool = plotting._pool
+    assert plotting._pool_ready.wait(60)
+    first = render_batch(SPECS[:3], str(tmp_path), {"dpi": 50})
+    second = render_batch(SPECS[:2], str(tmp_path), {"dpi": 50})
+
+    assert pool is not None and plotting._pool is pool
+    assert plotting._pool_key == (2, get_start_method())
+    assert all(error is None for _, _, error in first + second)
+
+
+# Launched as a script that imports main first, like a CLI session, so pool
+# workers have a heavy __main__ to re-run
+FIRST_BATCH = textwrap.dedent("""
+    import json, os, sys, tempfile, time
+    sys.path.insert(0, sys.argv[1])
+    import main
+    import plotting
+
+    if __name__ == "__main__":
+        plotting.os.cpu_count = lambda: 4
+        folder = tempfile.mkdtemp()
+        specs = [{"filename": f"p{i}.png", "plot_type": "line", "data": {"y": list(range(50))}}
+                 for i in range(2)]
+        plotting._render_spec((specs[0], folder, {}))     # matplotlib warm-up
+
+        start = time.perf_counter()
+        for spec in specs:
+            plotting._render_spec((spec, folder, {}))
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = plotting.render_batch(specs, folder)
+        first = time.perf_counter() - start
+
+        print(json.dumps({"serial": serial, "first": first,
+                          "errors": [e for _, _, e in results if e]}))
+        plotting.shutdown_pool()
+""")
+
+
+def test_first_batch_is_no_slower_than_serial_rendering(tmp_path):
+    script = tmp_path / "session.py"
+    script.write_text(FIRST_BATCH, encoding="utf-8")
+    result = subprocess.run([sys.executable, str(script), ROOT], cwd=tmp_path,
+                            capture_output=True, text=True, timeout=180)
+    assert result.returncode == 0, result.stderr
+
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    assert timings["errors"] == []
+    # Worker start-up (re-importing main and LangChain) takes seconds
+    assert timings["first"] <= timings["serial"] * 1.3 + 0.25, timings
@@ -0,0 +1,50 @@
+"""Profile a thread-pool workload, as LangGraph runs tool calls in worker threads"""
+
+import os
+import subprocess
+import sys
+import textwrap
+
+from profiling import HOTSPOTS_FILE, MEMORY_FILE, STACKS_FILE
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a child process: a profiler that kills worker threads hangs the
+# pool, which should fail this test instead of hanging the suite
+WORKLOAD = textwrap.dedent("""
+    import sys
+    from concurrent.futures import ThreadPoolExecutor
+
+    from profiling import SessionProfiler
+
+    def tool_call(n):
+        return sum(i * i for i in range(n))
+
+    profiler = SessionProfiler(sample_interval=0.001)
+    profiler.start()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(tool_call, [300_000] * 8))
+    profiler.stop()
+
+    assert results == [tool_call(300_000)] * 8
+    profiler.write_reports(sys.argv[1])
+""")
+
+
+def test_thread_pool_workload_is_profiled(tmp_path):
+    result = subprocess.run(
+        [sys.executable, "-c", WORKLOAD, str(tmp_path)],
+        cwd=ROOT, capture_output=True, text=True, timeout=60,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "Traceback" not in result.stderr
+    hotspots = (tmp_path / HOTSPOTS_FILE).read_text(encoding="utf-8")
+    stacks = (tmp_path / STACKS_FILE).read_text(encoding="utf-8")
+
+    # Calls made in the pool's threads are counted, not only the main thread's
+    line = next(l for l in hotspots.splitlines() if l.endswith("(tool_call)"))
+    assert line.split()[0].split("/")[0] == "8"   # ncalls, "total/primitive" on 3.12+
+    assert any(line.startswith("ThreadPoolExecutor") and "tool_call" in line
+               for line in stacks.splitlines())
+    assert "Peak traced memory" in (tmp_path / MEMORY_FILE).read_text(encoding="utf-8")
@@ -0,0 +1,195 @@
+"""Resilience layer against a local stub server injecting 429s, timeouts and outages"""
+
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from resilience import Backend, CircuitBreaker, CircuitOpenError
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    state = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        state = self.state
+        with state["lock"]:
+            state["hits"] += 1
+            hit = state["hits"]
+
+        if self.path == "/flaky" and hit <= state["fail_first"]:
+            self.send_response(429)
+            self.send_header("Retry-After", state["retry_after"])
+        elif self.path == "/every-third" and hit % 3 == 0:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+        elif self.path == "/slow" and hit <= state["fail_first"]:
+            time.sleep(0.5)
+            self.send_response(200)
+        elif self.path == "/missing":
+            self.send_response(404)
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        try:
+            self.wfile.write(b"ok")
+        except OSError:
+            pass   # client gave up (timeout tests)
+
+
+@pytest.fixture
+def stub():
+    state = {"lock": threading.Lock(), "hits": 0, "fail_first": 0, "retry_after": "0"}
+    handler = type("Handler", (StubHandler,), {"state": state})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", state
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(url, timeout=2.0):
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response
+
+
+def backend(**kwargs):
+    options = {"rate": 100.0, "capacity": 100, "attempts": 3, "base_delay": 0.01,
+               "max_delay": 0.5, "breaker_threshold": 3, "breaker_reset": 0.3}
+    options.update(kwargs)
+    return Backend("stub", **options)
+
+
+def test_rate_limited_calls_are_retried(stub):
+    url, state = stub
+    state["fail_first"] = 2
+    b = backend()
+
+    assert b.call(get, f"{url}/flaky").status_code == 200
+
+    m = b.metrics()
+    assert (m["retries"], m["rate_limited"], m["failures"]) == (2, 2, 0)
+    assert b.bucket.rate < b.bucket.max_rate   # slowed down after the 429s
+
+
+def test_retry_after_is_honored(stub):
+    url, state = stub
+    state["fail_first"] = 1
+    state["retry_after"] = "0.3"
+    b = backend()
+
+    start = time.perf_counter()
+    b.call(get, f"{url}/flaky")
+    assert time.perf_counter() - start >= 0.3
+
+
+def test_retry_after_above_max_delay_fails_fast(stub):
+    url, state = stub
+    state["fail_first"] = 1
+    state["retry_after"] = "3600"
+    b = backend()
+
+    start = time.perf_counter()
+    with pytest.raises(requests.HTTPError):
+        b.call(get, f"{url}/flaky")
+    assert time.perf_counter() - start < 1.0
+    assert state["hits"] == 1
+
+
+def test_timeouts_are_retried(stub):
+    url, state = stub
+    state["fail_first"] = 1
+    b = backend()
+
+    assert b.call(get, f"{url}/slow", timeout=0.2).status_code == 200
+    assert b.metrics()["retries"] == 1
+
+
+def test_client_errors_are_not_retried_and_keep_the_breaker_closed(stub):
+    url, state = stub
+    b = backend(breaker_threshold=1)
+
+    for _ in range(3):
+        with pytest.raises(requests.HTTPError):
+            b.call(get, f"{url}/missing")
+
+    assert state["hits"] == 3
+    assert b.breaker.state == "closed"
+
+
+def test_breaker_opens_when_the_backend_is_down():
+    # A port nobody listens on
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    b = backend(attempts=1, breaker_threshold=2)
+
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            b.call(get, f"http://127.0.0.1:{port}/")
+    with pytest.raises(CircuitOpenError):
+        b.call(get, f"http://127.0.0.1:{port}/")
+
+    assert b.breaker.state == "open"
+    assert b.metrics()["short_circuited"] == 1
+
+
+def test_half_open_breaker_lets_a_single_probe_through():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        allowed = list(pool.map(lambda _: breaker.allow(), range(8)))
+
+    assert allowed.count(True) == 1
+    assert breaker.state == "half_open"
+
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_failed_probe_reopens_the_breaker():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+
+def test_probe_ending_in_a_client_error_does_not_block_the_breaker(stub):
+    url, state = stub
+    b = backend(breaker_threshold=1, breaker_reset=0.05)
+    b.breaker.record_failure()
+    time.sleep(0.06)
+
+    with pytest.raises(requests.HTTPError):
+        b.call(get, f"{url}/missing")
+
+    assert b.call(get, f"{url}/ok").status_code == 200
+    assert b.breaker.state == "closed"
+
+
+def test_p95_latency_under_injected_429s(stub):
+    url, state = stub
+    b = backend(attempts=6)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        responses = list(pool.map(lambda _: b.call(get, f"{url}/every-third"), range(30)))
+
+    m = b.metrics()
+    assert all(r.status_code == 200 for r in responses)
+    assert m["failures"] == 0 and m["rate_limited"] >= 5
+    # Retries back off for at most a few hundred milliseconds
+    assert m["p95"] < 1.0
@@ -0,0 +1,106 @@
+"""Offline routing tests with scripted chat models"""
+
+from typing import Any, List
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from routing import RoutedChatModel
+
+
+class ScriptedModel(BaseChatModel):
+    """Returns the scripted responses in order; streams text word by word"""
+
+    name: str
+    responses: List[AIMessage]
+    calls: int = 0
+    chunks_sent: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _next(self) -> AIMessage:
+        response = self.responses[self.calls]
+        self.calls += 1
+        return response
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._next())])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        response = self._next()
+        if response.tool_calls:
+            self.chunks_sent += 1
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": tc["name"], "args": '{"query": "x"}', "id": tc["id"], "index": i}
+                for i, tc in enumerate(response.tool_calls)
+            ]))
+            return
+        for word in response.content.split(" "):
+            self.chunks_sent += 1
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+
+
+def tool_call(name="search_tool"):
+    return AIMessage(content="", tool_calls=[{"name": name, "args": {"query": "x"}, "id": "call_1"}])
+
+
+def make_router(fast_responses, strong_responses, **kwargs):
+    fast = ScriptedModel(name="fast", responses=fast_responses)
+    strong = ScriptedModel(name="strong", responses=strong_responses)
+    return RoutedChatModel(fast_model=fast, strong_model=strong, **kwargs), fast, strong
+
+
+def reasons(router):
+    return [(d["step"], d["model"], d["reason"]) for d in router.stats.decisions]
+
+
+def test_tool_selection_uses_fast_model_only():
+    router, fast, strong = make_router([tool_call()], [])
+
+    response = router.invoke([HumanMessage(content="search something")])
+
+    assert response.tool_calls[0]["name"] == "search_tool"
+    assert response.tool_calls[0]["args"] == {"query": "x"}
+    assert strong.calls == 0
+    assert reasons(router) == [(1, "ScriptedModel", "tool-selection")]
+
+
+def test_final_answer_is_written_by_strong_model():
+    long_answer = AIMessage(content=" ".join(["word"] * 500))
+    router, fast, strong = make_router([long_answer], [AIMessage(content="Strong answer.")])
+
+    response = router.invoke([HumanMessage(content="hi")])
+
+    assert response.content == "Strong answer."
+    # The fast model's answer is abandoned after its first token
+    assert fast.chunks_sent == 1
+    assert [r for _, _, r in reasons(router)] == ["synthesis-probe", "final-synthesis"]
+    assert {step for step, _, _ in reasons(router)} == {1}
+
+
+def test_failed_tool_escalates_to_strong_model():
+    router, fast, strong = make_router([], [tool_call("wiki_tool")])
+    messages = [
+        HumanMessage(content="hi"),
+        tool_call(),
+        ToolMessage(content="❌ Search error: timeout", tool_call_id="call_1"),
+    ]
+
+    response = router.invoke(messages)
+
+    assert response.tool_calls[0]["name"] == "wiki_tool"
+    assert fast.calls == 0
+    assert reasons(router) == [(2, "ScriptedModel", "hard-step")]
+
+
+def test_long_runs_escalate_to_strong_model():
+    router, fast, strong = make_router([], [AIMessage(content="done")], escalate_after_steps=2)
+    messages = [HumanMessage(content="hi"), AIMessage(content="a"), AIMessage(content="b")]
+
+    router.invoke(messages)
+
+    assert fast.calls == 0
+    assert reasons(router)[0][2] == "hard-step"
@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+from main import TOOLS
+from tool_selection import ALWAYS_ON, DATA_FALLBACK, ToolSelector, select_tools
+
+
+def names(tools):
+    return {t.name for t in tools}
+
+
+def test_research_query_can_find_urls_to_fetch():
+    query = "Research the top 5 programming languages in 2024 and create a pie chart"
+    selected = names(select_tools(query, TOOLS))
+    assert {"search_tool", "plot_tool"} <= selected
+    assert set(ALWAYS_ON) <= selected
+
+
+def test_web_fetch_always_brings_search():
+    tools = [
+        SimpleNamespace(name="web_fetch_tool", description="Fetch web pages by URL"),
+        SimpleNamespace(name="search_tool", description="Search the internet"),
+        SimpleNamespace(name="calculator_tool", description="Evaluate math"),
+    ]
+    selected = names(ToolSelector(tools).select("fetch these web pages", top_k=1))
+    assert selected == {"web_fetch_tool", "search_tool"}
+
+
+def test_always_on_tools_do_not_take_top_k_slots():
+    selected = ToolSelector(TOOLS).select("save the weather forecast for London", top_k=1)
+    assert names(selected) == {"weather_tool", *ALWAYS_ON}
+
+
+def test_chart_request_without_data_gets_a_data_source():
+    # Only plot tools match the wording, but the GDP figures have to come from somewhere
+    for query in ("Compare GDP of France and Germany and chart it",
+                  "Plot the population of the five largest cities in Japan"):
+        selected = names(select_tools(query, TOOLS))
+        assert "plot_tool" in selected
+        assert set(DATA_FALLBACK) <= selected
+
+
+def test_data_fallback_is_not_added_when_a_source_is_selected():
+    selected = names(select_tools("Read data.csv and plot the sales column", TOOLS))
+    assert "file_reader_tool" in selected
+    assert not set(DATA_FALLBACK) & selected
@@ -0,0 +1,191 @@
+"""web_fetch against a local HTTP server serving fixture pages"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import web_fetch
+from resilience import reset_backends
+from web_fetch import _extract_bs4, _extract_lxml, extract_main_text, fetch_many, fetch_page
+
+ARTICLE = """<html><head><title>Fixture Article</title><script>var x = 1;</script></head>
+<body>
+  <nav><a href="/">Home</a> | <a href="/about">About</a></nav>
+  <header>Site header</header>
+  <article>
+    <h1>Main heading</h1>
+    <p>First paragraph of the article body.</p>
+    <ul><li><p>Nested paragraph inside a list item.</p></li></ul>
+    <p>Second paragraph with <b>bold</b> text.</p>
+  </article>
+  <footer>Copyright footer</footer>
+</body></html>"""
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    state = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        state = self.state
+        with state["lock"]:
+            state["requests"].append((self.path, dict(self.headers)))
+
+        if self.path == "/article":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self._send(304, headers={"ETag": '"v1"'})
+            else:
+                self._send(200, ARTICLE.encode(), headers={"ETag": '"v1"'})
+        elif self.path.startswith("/slow/"):
+            with state["lock"]:
+                state["in_flight"] += 1
+                state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            time.sleep(0.2)
+            with state["lock"]:
+                state["in_flight"] -= 1
+            self._send(200, f"<html><body><p>Slow page {self.path}</p></body></html>".encode())
+        elif self.path.startswith("/long/"):
+            n = self.path.rsplit("/", 1)[1]
+            paragraphs = "".join(f"<p>Page {n} paragraph {i}.</p>" for i in range(400))
+            self._send(200, f"<html><body><article>{paragraphs}</article></body></html>".encode())
+        elif self.path == "/paper.pdf":
+            self._send(200, b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n1 0 obj\n", "application/pdf")
+        elif self.path == "/notes.txt":
+            self._send(200, b"Plain text notes.\n", "text/plain; charset=utf-8")
+        elif self.path == "/image.png":
+            self._send(200, b"\x89PNG\r\n\x1a\n", "image/png")
+        else:
+            self._send(404, b"not found")
+
+
+@pytest.fixture
+def server(monkeypatch):
+    state = {"lock": threading.Lock(), "requests": [], "in_flight": 0, "max_in_flight": 0}
+    handler = type("Handler", (FixtureHandler,), {"state": state})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    web_fetch.clear_cache()
+    web_fetch._host_slots.clear()
+    reset_backends()
+
+    base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield base, state
+
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_lxml_and_bs4_extract_the_same_main_text():
+    for extract in (_extract_lxml, _extract_bs4):
+        title, text = extract(ARTICLE)
+        assert title == "Fixture Article"
+        assert text.split("\n\n") == [
+            "Main heading",
+            "First paragraph of the article body.",
+            "Nested paragraph inside a list item.",
+            "Second paragraph with bold text.",
+        ]
+
+
+def test_extraction_falls_back_to_bs4(monkeypatch):
+    def broken(html):
+        raise ValueError("lxml failed")
+
+    monkeypatch.setattr(web_fetch, "_extract_lxml", broken)
+    assert extract_main_text(ARTICLE) == _extract_bs4(ARTICLE)
+
+
+def test_pages_are_fetched_concurrently(server, monkeypatch):
+    base, state = server
+    monkeypatch.setenv("AGENT_FETCH_PER_HOST", "4")
+
+    pages, stats = fetch_many([f"{base}/slow/{i}" for i in range(4)])
+
+    assert stats["ok"] == 4
+    assert [p["text"] for p in pages] == [f"Slow page /slow/{i}" for i in range(4)]
+    assert state["max_in_flight"] == 4
+    assert stats["seconds"] < 0.6   # one after another would take 0.8s
+
+
+def test_per_host_limit_caps_concurrent_requests(server, monkeypatch):
+    base, state = server
+    monkeypatch.setenv("AGENT_FETCH_PER_HOST", "2")
+
+    pages, stats = fetch_many([f"{base}/slow/{i}" for i in range(6)])
+
+    assert stats["ok"] == 6
+    assert state["max_in_flight"] == 2
+
+
+def test_repeated_fetch_revalidates_with_etag(server):
+    base, state = server
+
+    first = fetch_page(f"{base}/article")
+    second = fetch_page(f"{base}/article")
+
+    assert (first["status"], first["cached"]) == (200, False)
+    assert (second["status"], second["cached"]) == (304, True)
+    assert second["text"] == first["text"]
+    assert state["requests"][1][1].get("If-None-Match") == '"v1"'
+
+
+def test_non_html_content_is_refused(server):
+    base, _ = server
+
+    pdf = fetch_page(f"{base}/paper.pdf")
+    image = fetch_page(f"{base}/image.png")
+    text = fetch_page(f"{base}/notes.txt")
+
+    assert "url_pdf_reader_tool" in pdf["error"] and not pdf["text"]
+    assert "image/png" in image["error"] and not image["text"]
+    assert text["error"] is None and text["text"] == "Plain text notes."
+
+
+def test_web_fetch_tool_keeps_every_page_handle_visible(server, tmp_path, monkeypatch):
+    from tools import web_fetch_tool
+
+    base, _ = server
+    monkeypatch.setenv("AGENT_OUTPUT_FOLDER", str(tmp_path))
+    monkeypatch.setenv("AGENT_MAX_TOOL_RESULT_CHARS", "4000")
+    monkeypatch.setenv("AGENT_DEDUP", "off")
+
+    result = web_fetch_tool.invoke({"urls": f"{base}/long/1, {base}/long/2, {base}/long/3"})
+
+    for i in (1, 2, 3):
+        assert f"_web_fetch_page{i}.txt" in result
+    assert "web_fetch_tool.txt" not in result
+    assert len(result) < 4000
+
+
+def test_web_fetch_tool_result_stays_bounded_for_many_urls(server, tmp_path, monkeypatch):
+    from tools import web_fetch_tool
+
+    base, state = server
+    monkeypatch.setenv("AGENT_OUTPUT_FOLDER", str(tmp_path))
+    monkeypatch.setenv("AGENT_MAX_TOOL_RESULT_CHARS", "4000")
+    monkeypatch.setenv("AGENT_DEDUP", "off")
+
+    urls = [f"{base}/long/{i}" for i in range(1, 21)]
+    result = web_fetch_tool.invoke({"urls": json.dumps(urls)})
+
+    assert len(result) <= 4000
+    assert "call web_fetch_tool again for the other 16" in result
+    for i in (1, 2, 3, 4):
+        assert f"_web_fetch_page{i}.txt" in result
+    assert len(state["requests"]) == 4
@@ -0,0 +1,160 @@
+"""
+Per-query tool selection.
+
+Binding every tool schema to the model costs a fixed amount of prompt tokens
+on every agent step. This module scores the tools against the user query with
+BM25 over each tool's name and docstring, so only the relevant subset is
+bound to the agent.
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import List, Sequence, Tuple
+
+# Tools that are bound regardless of the query
+ALWAYS_ON = ("save_tool", "artifact_reader_tool")
+
+# Extra vocabulary for requests that rarely use the docstring wording
+KEYWORD_HINTS = {
+    "search_tool": "research find latest news internet online who information",
+    "wiki_tool": "research who what history biography information encyclopedia",
+    "calculator_tool": "calculate math arithmetic number",
+    "code_executor_tool": "code generate sequence algorithm program script fibonacci primes",
+    "plot_tool": "plot chart graph visualize visualization figure",
+    "plot_batch_tool": "plots charts graphs both several multiple visualize visualization figures",
+    "data_analysis_tool": "analyze analysis statistics mean median stdev",
+    "file_reader_tool": "read open file text",
+    "summarize_tool": "summarize summary shorten",
+    "weather_tool": "weather temperature forecast",
+    "web_fetch_tool": "research page pages website article url link read",
+}
+
+# Tools that are useless without another one: web_fetch_tool needs URLs,
+# which usually come from search_tool
+COMPANIONS = {
+    "web_fetch_tool": ("search_tool",),
+}
+
+# Bound when nothing in the query matches any tool
+FALLBACK = ("search_tool", "wiki_tool", "calculator_tool", "code_executor_tool")
+
+# Tools that bring data into the session. A query like "Compare GDP of France
+# and Germany and chart it" only matches tools that consume data (plot, save),
+# and the subset is kept for the whole session, including resumes, so
+# DATA_FALLBACK is bound whenever none of these is selected
+DATA_SOURCES = (
+    "search_tool", "wiki_tool", "web_fetch_tool", "calculator_tool", "code_executor_tool",
+    "file_reader_tool", "pdf_reader_tool", "url_pdf_reader_tool", "weather_tool",
+)
+DATA_FALLBACK = ("search_tool", "wiki_tool")
+
+_STOPWORDS = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of',
+    'with', 'by', 'is', 'are', 'be', 'it', 'this', 'that', 'from', 'as', 'e',
+    'g', 'i', 'me', 'my', 'please', 'can', 'you', 'args', 'default',
+}
+_SUFFIXES = ("ions", "ing", "ed", "es", "or", "s", "e")
+
+
+def _stem(word: str) -> str:
+    """Very small suffix stripper, enough to match 'calculate'/'calculations'"""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split on non-letters (and underscores), drop stopwords, stem"""
+    words = re.findall(r'[a-z]+', text.lower())
+    return [_stem(w) for w in words if w not in _STOPWORDS and len(w) > 1]
+
+
+class ToolSelector:
+    """BM25 index over tool names and descriptions"""
+
+    def __init__(self, tools: Sequence, k1: float = 1.2, b: float = 0.75):
+        self.tools = list(tools)
+        self.k1 = k1
+        self.b = b
+
+        # The tool name is repeated so it weighs more than a docstring mention
+        self._docs = [
+            Counter(tokenize(
+                f"{t.name} {t.name} {t.description} {KEYWORD_HINTS.get(t.name, '')}"
+            ))
+            for t in self.tools
+        ]
+        self._lengths = [sum(d.values()) for d in self._docs]
+        self._avg_length = sum(self._lengths) / max(len(self._lengths), 1)
+
+        n = len(self._docs)
+        df = Counter()
+        for doc in self._docs:
+            df.update(doc.keys())
+        self._idf = {
+            term: math.log(1 + (n - freq + 0.5) / (freq + 0.5)) for term, freq in df.items()
+        }
+
+    def score(self, query: str) -> List[Tuple[float, object]]:
+        """BM25 score of every tool against the query, best first"""
+        terms = tokenize(query)
+        scored = []
+        for tool, doc, length in zip(self.tools, self._docs, self._lengths):
+            total = 0.0
+            for term in terms:
+                tf = doc.get(term, 0)
+                if not tf:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * length / self._avg_length)
+                total += self._idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            scored.append((total, tool))
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return scored
+
+    def select(self, query: str, top_k: int = 5, min_ratio: float = 0.25) -> List:
+        """
+        Pick the tools to bind for a query.
+
+        Keeps up to `top_k` tools whose score is at least `min_ratio` of the
+        best score, plus their COMPANIONS and the ALWAYS_ON tools. Falls back
+        to FALLBACK when no tool matches at all, and adds DATA_FALLBACK when
+        no DATA_SOURCES tool is kept. Original tool order is preserved.
+        """
+        # ALWAYS_ON tools are bound anyway, they must not take a top_k slot
+        scored = [(s, t) for s, t in self.score(query) if t.name not in ALWAYS_ON]
+        best = scored[0][0] if scored else 0.0
+
+        if best <= 0:
+            names = set(FALLBACK)
+        else:
+            names = {t.name for s, t in scored[:top_k] if s >= best * min_ratio}
+        if not names & set(DATA_SOURCES):
+            names.update(DATA_FALLBACK)
+        for name in list(names):
+            names.update(COMPANIONS.get(name, ()))
+        names.update(ALWAYS_ON)
+
+        return [t for t in self.tools if t.name in names]
+
+
+def estimate_tool_tokens(tools: Sequence) -> int:
+    """Rough prompt-token cost of binding these tool schemas (~4 chars per token)"""
+    from langchain_core.utils.function_calling import convert_to_openai_tool
+
+    chars = sum(len(json.dumps(convert_to_openai_tool(t))) for t in tools)
+    return chars // 4
+
+
+def select_tools(query: str, tools: Sequence) -> List:
+    """
+    Select the tool subset for a query, configured by environment variables:
+      AGENT_TOOL_SELECTION (on/off, default on), AGENT_TOOL_TOP_K (default 5)
+    """
+    if os.environ.get("AGENT_TOOL_SELECTION", "on").lower() in ("off", "0", "false"):
+        return list(tools)
+    top_k = int(os.environ.get("AGENT_TOOL_TOP_K", "5"))
+    return ToolSelector(tools).select(query, top_k=top_k)
@@ -9,19 +9,104 @@ import statistics
 from typing import Dict, Any, List
 import matplotlib
 matplotlib.use('Agg')  # Use non-GUI backend to avoid threading issues
-import matplotlib.pyplot as plt
 import numpy as np
+import functools
 import os
+import threading
+import time
+from plotting import render_figure, render_batch
+from resilience import get_backend
+from dedup import dedup_text
 
 # Helper function to get output folder
 def get_output_folder():
     """Get the current output folder from environment variable"""
     return os.environ.get('AGENT_OUTPUT_FOLDER', '.')
 
+# ---------------------------
+# Result Size Governance
+# ---------------------------
+ARTIFACT_PREFIX = "artifact://"
+_artifact_lock = threading.Lock()
+
+def get_max_result_chars():
+    """Largest tool result passed to the model as-is (AGENT_MAX_TOOL_RESULT_CHARS)"""
+    return int(os.environ.get('AGENT_MAX_TOOL_RESULT_CHARS', '4000'))
+
+def _artifact_path(handle: str) -> str:
+    """Resolve an artifact handle to a file inside the session artifacts folder"""
+    relative = handle[len(ARTIFACT_PREFIX):] if handle.startswith(ARTIFACT_PREFIX) else handle
+    artifacts_dir = os.path.abspath(os.path.join(get_output_folder(), "artifacts"))
+    path = os.path.abspath(os.path.join(get_output_folder(), relative))
+    if os.path.dirname(path) != artifacts_dir:
+        raise ValueError(f"Invalid artifact handle: {handle}")
+    return path
+
+def _spill_message(text: str, handle: str, head_chars: int, tail_chars: int) -> str:
+    head = text[:head_chars]
+    tail = text[len(text) - tail_chars:] if tail_chars else ""
+    return f"""📦 Large result stored as artifact: {handle}
+Size: {len(text)} characters, {text.count(chr(10)) + 1} lines, ~{len(text) // 4} tokens
+
+Preview (first {len(head)} and last {len(tail)} characters):
+{head}
+[...]
+{tail}
+
+Use artifact_reader_tool with handle="{handle}" and offset={len(head)} to read the rest.
+"""
+
+def spill_large_result(text: str, tool_name: str, limit: int = None) -> str:
+    """
+    Keep tool results bounded. Results over the size limit (default
+    get_max_result_chars()) are written in full to outputs/{session}/artifacts/
+    and replaced by a preview, size stats and a handle that
+    artifact_reader_tool can dereference. The preview is sized so the whole
+    message fits in the limit; text that the message would not shorten is
+    returned as-is.
+    """
+    limit = limit or get_max_result_chars()
+    if not isinstance(text, str) or len(text) <= limit:
+        return text
+
+    # Message without preview, with the widest handle and numbers it can have
+    widest = f"{ARTIFACT_PREFIX}artifacts/0000_{tool_name}.txt"
+    frame = len(_spill_message(text, widest, 0, 0)) + 3 * len(str(limit))
+    preview = max(limit - frame, 0)
+    if frame + preview >= len(text):
+        return text
+
+    artifacts_dir = os.path.join(get_output_folder(), "artifacts")
+    os.makedirs(artifacts_dir, exist_ok=True)
+    # Tool calls run in parallel threads: claim the next number under a lock
+    # and create the file exclusively, so no result can overwrite another
+    with _artifact_lock:
+        number = len(os.listdir(artifacts_dir)) + 1
+        while True:
+            name = f"{number:03d}_{tool_name}.txt"
+            try:
+                f = open(os.path.join(artifacts_dir, name), "x", encoding="utf-8")
+                break
+            except FileExistsError:
+                number += 1
+    with f:
+        f.write(text)
+
+    head = preview * 4 // 5
+    return _spill_message(text, f"{ARTIFACT_PREFIX}artifacts/{name}", head, preview - head)
+
+def bounded_result(func):
+    """Decorator applying spill_large_result to a tool function's output"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return spill_large_result(func(*args, **kwargs), func.__name__)
+    return wrapper
+
 # ---------------------------
 # Save Tool
 # ---------------------------
 @tool
+@bounded_result
 def save_tool(data: str, filename: str = "research_output.txt") -> str:
     """
     Saves structured research data to a text file in the output folder.
@@ -55,6 +140,7 @@ def save_tool(data: str, filename: str = "research_output.txt") -> str:
 _ddg = DuckDuckGoSearchRun()
 
 @tool
+@bounded_result
 def search_tool(query: str) -> str:
     """
     Search the web for information using DuckDuckGo.
@@ -63,8 +149,10 @@ def search_tool(query: str) -> str:
         query: The search query
     """
     try:
-        result = _ddg.run(query)
-        return result
+        result = get_backend("duckduckgo").call(_ddg.run, query)
+        # Spilled before remembering, so only the preview counts as shown
+        return dedup_text(result, "search_tool", get_output_folder(),
+                          bound=lambda text: spill_large_result(text, "search_tool"))
     except Exception as e:
         return f"Search error: {str(e)}"
 
@@ -78,6 +166,7 @@ _api_wrapper = WikipediaAPIWrapper(
 _wiki = WikipediaQueryRun(api_wrapper=_api_wrapper)
 
 @tool
+@bounded_result
 def wiki_tool(query: str) -> str:
     """
     Query Wikipedia for summary information.
@@ -86,7 +175,9 @@ def wiki_tool(query: str) -> str:
         query: The topic to search on Wikipedia
     """
     try:
-        return _wiki.run(query)
+        result = get_backend("wikipedia").call(_wiki.run, query)
+        return dedup_text(result, "wiki_tool", get_output_folder(),
+                          bound=lambda text: spill_large_result(text, "wiki_tool"))
     except Exception as e:
         return f"Wikipedia error: {str(e)}"
 
@@ -94,6 +185,7 @@ def wiki_tool(query: str) -> str:
 # Calculator Tool
 # ---------------------------
 @tool
+@bounded_result
 def calculator_tool(expression: str) -> str:
     """
     Perform mathematical calculations. Supports basic arithmetic, powers, and common math functions.
@@ -136,6 +228,7 @@ def calculator_tool(expression: str) -> str:
 # Plot Tool
 # ---------------------------
 @tool
+@bounded_result
 def plot_tool(data_dict: str, plot_type: str = "line", title: str = "Data Visualization", filename: str = "plot.png") -> str:
     """
     Create data visualizations and save them as PNG files in the output folder.
@@ -154,62 +247,59 @@ def plot_tool(data_dict: str, plot_type: str = "line", title: str = "Data Visual
         # Parse data
         data = json.loads(data_dict)
         
-        # Create figure with non-interactive backend
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        if plot_type == "line":
-            x_data = data.get("x", list(range(len(data["y"]))))
-            ax.plot(x_data, data["y"], marker='o', linewidth=2, markersize=8)
-            ax.set_xlabel(data.get("xlabel", "X"), fontsize=12)
-            ax.set_ylabel(data.get("ylabel", "Y"), fontsize=12)
-            ax.grid(True, alpha=0.3)
-            
-        elif plot_type == "bar":
-            labels = data.get("labels", data.get("x", []))
-            values = data.get("values", data.get("y", []))
-            ax.bar(labels, values, color='skyblue', edgecolor='navy', alpha=0.7)
-            ax.set_xlabel(data.get("xlabel", "Categories"), fontsize=12)
-            ax.set_ylabel(data.get("ylabel", "Values"), fontsize=12)
-            plt.xticks(rotation=45, ha='right')
-            ax.grid(True, alpha=0.3, axis='y')
-            
-        elif plot_type == "scatter":
-            ax.scatter(data["x"], data["y"], alpha=0.6, s=100, c='coral', edgecolors='darkred')
-            ax.set_xlabel(data.get("xlabel", "X"), fontsize=12)
-            ax.set_ylabel(data.get("ylabel", "Y"), fontsize=12)
-            ax.grid(True, alpha=0.3)
-            
-        elif plot_type == "pie":
-            labels = data.get("labels", [])
-            values = data.get("values", [])
-            ax.pie(values, labels=labels, autopct='%1.1f%%', startangle=90)
-            
-        elif plot_type == "histogram":
-            ax.hist(data["values"], bins=data.get("bins", 10), 
-                   color='lightgreen', edgecolor='darkgreen', alpha=0.7)
-            ax.set_xlabel(data.get("xlabel", "Values"), fontsize=12)
-            ax.set_ylabel(data.get("ylabel", "Frequency"), fontsize=12)
-            ax.grid(True, alpha=0.3, axis='y')
-        
-        ax.set_title(title, fontsize=14, fontweight='bold')
-        plt.tight_layout()
-        
         # Save to output folder
         output_folder = get_output_folder()
-        filepath = os.path.join(output_folder, filename)
-        
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close(fig)
+        filepath = render_figure(data, plot_type, title, os.path.join(output_folder, filename))
         
         return f"✅ Plot saved successfully as {filepath}"
     except Exception as e:
-        plt.close('all')
         return f"❌ Plotting error: {str(e)}"
 
+# ---------------------------
+# Batch Plot Tool
+# ---------------------------
+@tool
+@bounded_result
+def plot_batch_tool(specs: str, style: str = "{}") -> str:
+    """
+    Create several plots in one call, rendered in parallel. Prefer this over
+    repeated plot_tool calls when a request needs more than one chart.
+    
+    Args:
+        specs: JSON list of plot specs, each with "data" (same format as plot_tool's data_dict),
+               "plot_type", "title" and "filename"
+        style: Optional JSON with shared styling for all plots: "figsize", "dpi", "color",
+               "label_fontsize", "title_fontsize", "grid_alpha"
+    
+    Example:
+        specs='[{"data": {"x": [1,2,3], "y": [1,4,9]}, "plot_type": "line", "title": "Growth", "filename": "growth.png"},
+                {"data": {"values": [1,2,2,3]}, "plot_type": "histogram", "title": "Spread", "filename": "spread.png"}]'
+    """
+    try:
+        spec_list = json.loads(specs)
+        shared_style = json.loads(style) if style else {}
+        
+        if not isinstance(spec_list, list) or not spec_list:
+            return "❌ specs must be a non-empty JSON list of plot specs"
+        
+        start = time.perf_counter()
+        results = render_batch(spec_list, get_output_folder(), shared_style)
+        elapsed = time.perf_counter() - start
+        
+        saved = [path for _, path, error in results if not error]
+        lines = [f"✅ {path}" if not error else f"❌ {filename}: {error}"
+                 for filename, path, error in results]
+        
+        return (f"📊 Rendered {len(saved)}/{len(results)} plots in {elapsed:.2f}s:\n"
+                + "\n".join(lines))
+    except Exception as e:
+        return f"❌ Batch plotting error: {str(e)}"
+
 # ---------------------------
 # Data Analysis Tool
 # ---------------------------
 @tool
+@bounded_result
 def data_analysis_tool(data: str, analysis_type: str = "summary") -> str:
     """
     Analyze datasets and compute statistics.
@@ -265,6 +355,7 @@ def data_analysis_tool(data: str, analysis_type: str = "summary") -> str:
 # File Reader Tool
 # ---------------------------
 @tool
+@bounded_result
 def file_reader_tool(filename: str) -> str:
     """
     Read content from existing text files.
@@ -285,6 +376,7 @@ def file_reader_tool(filename: str) -> str:
 # Code Executor Tool
 # ---------------------------
 @tool
+@bounded_result
 def code_executor_tool(code: str) -> str:
     """
     Execute simple Python code safely (limited operations for security).
@@ -338,6 +430,7 @@ def code_executor_tool(code: str) -> str:
 # Weather Tool
 # ---------------------------
 @tool
+@bounded_result
 def weather_tool(location: str) -> str:
     """
     Get current weather information for a location.
@@ -365,6 +458,7 @@ Note: For real-time data, integrate with OpenWeatherMap or similar API
 # Summarize Tool
 # ---------------------------
 @tool
+@bounded_result
 def summarize_tool(text: str, max_length: int = 150) -> str:
     """
     Summarize long text content.
@@ -398,6 +492,7 @@ Summary length: {len(summary.split())} words
 # PDF Reader Tool (Local Files)
 # ---------------------------
 @tool
+@bounded_result
 def pdf_reader_tool(pdf_path: str) -> str:
     """
     Read and extract text from a local PDF file.
@@ -430,7 +525,7 @@ File: {pdf_path}
 Pages: {num_pages}
 
 Content:
-{full_text[:2000]}{'...' if len(full_text) > 2000 else ''}
+{full_text}
 
 Total characters: {len(full_text)}
 """
@@ -443,6 +538,7 @@ Total characters: {len(full_text)}
 # URL PDF Reader Tool
 # ---------------------------
 @tool
+@bounded_result
 def url_pdf_reader_tool(url: str) -> str:
     """
     Download and read a PDF from a URL.
@@ -457,9 +553,13 @@ def url_pdf_reader_tool(url: str) -> str:
         import requests
         from io import BytesIO
         
-        # Download PDF
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+        def download(pdf_url):
+            response = requests.get(pdf_url, timeout=30)
+            response.raise_for_status()
+            return response
+        
+        # Download PDF (rate limited, retried on 429/5xx/timeouts)
+        response = get_backend("pdf").call(download, url)
         
         # Read PDF from bytes
         pdf_file = BytesIO(response.content)
@@ -489,12 +589,118 @@ URL: {url}
 Saved to: {pdf_path}
 Pages: {num_pages}
 
-Content Preview:
-{full_text[:2000]}{'...' if len(full_text) > 2000 else ''}
+Content:
+{full_text}
 
 Total characters: {len(full_text)}
 """
     except ImportError:
         return "❌ Required libraries not installed. Install with: pip install PyPDF2 requests"
     except Exception as e:
-        return f"❌ Error downloading/reading PDF: {str(e)}"
\ No newline at end of file
+        return f"❌ Error downloading/reading PDF: {str(e)}"
+
+# ---------------------------
+# Web Fetch Tool
+# ---------------------------
+# Result budget kept for the summary line, and the smallest share of it a
+# page gets: web_fetch_tool fetches only as many URLs per call as fit
+FETCH_HEADER_CHARS = 300
+FETCH_MIN_PAGE_CHARS = 800
+
+@tool
+def web_fetch_tool(urls: str) -> str:
+    """
+    Fetch one or more web pages concurrently and extract their main text.
+    Use this to read full pages found with search_tool. Only as many URLs as
+    fit in one result are fetched per call (4 by default).
+    
+    Args:
+        urls: JSON list of URLs, e.g., '["https://a.com/x", "https://b.org/y"]',
+              or URLs separated by commas/newlines
+    """
+    try:
+        from web_fetch import fetch_many
+        
+        try:
+            url_list = json.loads(urls)
+            if isinstance(url_list, str):
+                url_list = [url_list]
+        except json.JSONDecodeError:
+            url_list = [u.strip() for u in urls.replace(',', '\n').split('\n')]
+        url_list = [u for u in url_list if u]
+        
+        if not url_list:
+            return "❌ No URLs provided"
+        
+        limit = get_max_result_chars()
+        max_urls = max((limit - FETCH_HEADER_CHARS) // FETCH_MIN_PAGE_CHARS, 1)
+        skipped = len(url_list) - max_urls
+        url_list = url_list[:max_urls]
+        
+        pages, stats = fetch_many(url_list)
+        
+        # Not wrapped in @bounded_result: each page gets an equal share of the
+        # result budget instead, so every page handle stays visible to the model
+        separator = "\n\n---\n\n"
+        share = (limit - FETCH_HEADER_CHARS) // len(pages)
+        
+        sections = []
+        for i, page in enumerate(pages, 1):
+            if page["error"]:
+                sections.append(f"[{i}] {page['url']}\n❌ Fetch error: {page['error']}")
+                continue
+            cached = " (cached)" if page["cached"] else ""
+            heading = f"[{i}] {page['title'] or page['url']}{cached}\nURL: {page['url']}\n\n"
+            page_limit = max(share - len(heading) - len(separator), 1)
+            # Repeats of this page refer to its URL, shown in the heading
+            text = dedup_text(page["text"], "web_fetch_tool", get_output_folder(),
+                              bound=lambda t: spill_large_result(t, f"web_fetch_page{i}", page_limit),
+                              label=page["url"])
+            sections.append(heading + text)
+        
+        note = (f"⚠️ Only the first {max_urls} URLs fit in one result; "
+                f"call web_fetch_tool again for the other {skipped}\n\n") if skipped > 0 else ""
+        result = (f"🌐 Fetched {stats['ok']}/{stats['pages']} pages in {stats['seconds']:.2f}s "
+                  f"({stats['pages_per_sec']:.1f} pages/s, {stats['cached']} from cache)\n\n"
+                  + note + separator.join(sections))
+        # Long titles or error messages can still push it over the budget
+        return spill_large_result(result, "web_fetch_tool")
+    except ImportError:
+        return "❌ Required libraries not installed. Install with: pip install requests lxml beautifulsoup4"
+    except Exception as e:
+        return f"❌ Error fetching pages: {str(e)}"
+
+# ---------------------------
+# Artifact Reader Tool
+# ---------------------------
+@tool
+def artifact_reader_tool(handle: str, offset: int = 0) -> str:
+    """
+    Read part of a large tool result that was stored as an artifact.
+    
+    Args:
+        handle: Artifact handle from a previous tool result (e.g., "artifact://artifacts/001_pdf_reader_tool.txt")
+        offset: Character offset to start reading from (default: 0)
+    """
+    try:
+        path = _artifact_path(handle)
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        
+        # Leave room for the header so the page stays under the result limit
+        page_size = max(get_max_result_chars() - 200, 500)
+        offset = max(0, offset)
+        chunk = text[offset:offset + page_size]
+        end = offset + len(chunk)
+        
+        footer = (f"Next: offset={end}" if end < len(text) else "End of artifact")
+        return f"""📦 {handle} (characters {offset}-{end} of {len(text)}):
+
+{chunk}
+
+{footer}
+"""
+    except FileNotFoundError:
+        return f"❌ Artifact '{handle}' not found"
+    except Exception as e:
+        return f"❌ Error reading artifact: {str(e)}"
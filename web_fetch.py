@@ -0,0 +1,219 @@
+"""
+Concurrent web page fetching and main-text extraction.
+
+Pages are fetched in a thread pool over one pooled requests.Session, with a
+cap on concurrent requests per host, and go through the shared resilience
+layer (one backend per host). Main text is extracted with lxml and falls
+back to BeautifulSoup when lxml cannot handle the document. Responses are
+cached by URL and revalidated with ETag / Last-Modified, so fetching the
+same page again in a session costs a 304 instead of a full download.
+
+Only HTML and plain-text responses are extracted; PDFs and other binary
+content are reported as errors instead of being decoded into garbage.
+"""
+
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from urllib.parse import urlparse
+
+from resilience import get_backend
+
+USER_AGENT = "Mozilla/5.0 (compatible; AdvancedResearchAgent/1.0)"
+
+# Elements that never hold the main content of a page
+_NOISE_TAGS = ("script", "style", "noscript", "nav", "footer", "header",
+               "aside", "form", "svg", "iframe")
+_BLOCK_TAGS = ("h1", "h2", "h3", "h4", "p", "li", "pre", "blockquote", "td")
+_HTML_TYPES = ("text/html", "application/xhtml+xml")
+
+_session = None
+_session_lock = threading.Lock()
+_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+_host_lock = threading.Lock()
+_cache: Dict[str, Dict] = {}
+_cache_lock = threading.Lock()
+
+
+def get_max_workers() -> int:
+    return int(os.environ.get("AGENT_FETCH_WORKERS", "8"))
+
+
+def get_per_host_limit() -> int:
+    return int(os.environ.get("AGENT_FETCH_PER_HOST", "2"))
+
+
+def get_session():
+    """Shared requests.Session with a connection pool sized for the workers"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=get_max_workers())
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            _session = session
+        return _session
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    host = urlparse(url).netloc
+    with _host_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(get_per_host_limit())
+        return _host_slots[host]
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _extract_lxml(html: str) -> Tuple[str, str]:
+    import lxml.html
+
+    root = lxml.html.fromstring(html)
+    title = _normalize(root.findtext(".//title") or "")
+
+    for element in list(root.iter(*_NOISE_TAGS)):
+        element.drop_tree()
+
+    # Prefer an explicit main-content container when the page has one
+    containers = root.xpath("//article | //main | //*[@role='main']")
+    container = containers[0] if containers else root
+
+    # Skip blocks nested in other blocks (e.g. <p> inside <li>) to avoid repeats
+    blocks = [
+        _normalize(el.text_content()) for el in container.iter(*_BLOCK_TAGS)
+        if not any(a.tag in _BLOCK_TAGS for a in el.iterancestors())
+    ]
+    blocks = [b for b in blocks if b]
+    text = "\n\n".join(blocks) if blocks else _normalize(container.text_content())
+    return title, text
+
+
+def _extract_bs4(html: str) -> Tuple[str, str]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    title = _normalize(soup.title.get_text()) if soup.title else ""
+
+    for element in soup(list(_NOISE_TAGS)):
+        element.decompose()
+
+    container = soup.find("article") or soup.find("main") or soup.body or soup
+    blocks = [
+        _normalize(el.get_text(" ")) for el in container.find_all(list(_BLOCK_TAGS))
+        if not el.find_parent(list(_BLOCK_TAGS))
+    ]
+    blocks = [b for b in blocks if b]
+    text = "\n\n".join(blocks) if blocks else _normalize(container.get_text(" "))
+    return title, text
+
+
+def extract_main_text(html: str) -> Tuple[str, str]:
+    """Return (title, main text) of an HTML page, lxml first, bs4 as fallback"""
+    try:
+        return _extract_lxml(html)
+    except Exception:
+        return _extract_bs4(html)
+
+
+def _content_type(response) -> str:
+    return response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+
+
+def fetch_page(url: str, timeout: float = 15.0) -> Dict:
+    """
+    Fetch one page and extract its main text.
+
+    Returns a dict with url, status, title, text, cached, error and elapsed.
+    Errors are reported in the dict rather than raised, so one bad URL does
+    not fail a whole batch.
+    """
+    start = time.perf_counter()
+    page = {"url": url, "status": None, "title": "", "text": "",
+            "cached": False, "error": None, "elapsed": 0.0}
+
+    with _cache_lock:
+        cached = _cache.get(url)
+
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    def get(page_url):
+        response = get_session().get(page_url, headers=headers, timeout=timeout)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    try:
+        with _host_slot(url):
+            response = get_backend(f"web:{urlparse(url).netloc}").call(get, url)
+        page["status"] = response.status_code
+
+        if response.status_code == 304 and cached:
+            page.update(title=cached["title"], text=cached["text"], cached=True)
+        else:
+            content_type = _content_type(response)
+            if content_type == "application/pdf":
+                raise ValueError("URL is a PDF document, read it with url_pdf_reader_tool")
+            if content_type == "text/plain":
+                title, text = "", response.text.strip()
+            elif content_type in _HTML_TYPES or not content_type:
+                title, text = extract_main_text(response.text)
+            else:
+                raise ValueError(f"Unsupported content type: {content_type}")
+            page.update(title=title, text=text)
+
+            if response.headers.get("ETag") or response.headers.get("Last-Modified"):
+                with _cache_lock:
+                    _cache[url] = {
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                        "title": title,
+                        "text": text,
+                    }
+    except Exception as e:
+        page["error"] = str(e)
+
+    page["elapsed"] = time.perf_counter() - start
+    return page
+
+
+def fetch_many(urls: List[str], timeout: float = 15.0) -> Tuple[List[Dict], Dict]:
+    """
+    Fetch a batch of URLs concurrently.
+
+    Returns the pages (in input order) and throughput stats:
+    pages, ok, cached, seconds, pages_per_sec.
+    """
+    start = time.perf_counter()
+    workers = max(1, min(get_max_workers(), len(urls)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pages = list(pool.map(lambda u: fetch_page(u, timeout), urls))
+    seconds = time.perf_counter() - start
+
+    stats = {
+        "pages": len(pages),
+        "ok": sum(1 for p in pages if not p["error"]),
+        "cached": sum(1 for p in pages if p["cached"]),
+        "seconds": seconds,
+        "pages_per_sec": len(pages) / seconds if seconds > 0 else 0.0,
+    }
+    return pages, stats